@@ -0,0 +1,248 @@
+"""Move cold posts to the compressed archive tables.
+
+    python -m app.archive partition        # MySQL: partition posts by month
+    python -m app.archive archive --older-than-days 180
+
+`archive` moves posts created before the cutoff, together with their votes,
+into `posts_archive` and `votes_archive` in small batches, each in its own
+transaction, so it can be stopped and rerun at any point. When `posts` is
+partitioned it also drops the partitions that have been emptied, and adds
+partitions for the coming months.
+
+Partitioning is for dropping old months cheaply, not for faster reads: the
+hot reads look posts up by id or title, never by `created_at`, so MySQL
+cannot prune partitions and a lookup by id probes the primary key of every
+partition. Archiving regularly keeps the number of partitions small.
+"""
+
+import argparse
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import Connection, delete, insert, literal, select, text
+from sqlalchemy.orm import Session
+
+from . import models
+from .database import SessionLocal, engine
+from .stats import POSTS_COUNTER, bump_counter
+
+ARCHIVED_COLUMNS = (
+    "id",
+    "title",
+    "content",
+    "published",
+    "rating",
+    "created_at",
+    "modified_at",
+    "user_id",
+)
+
+
+def archive_posts(db: Session, cutoff: datetime, batch_size: int) -> int:
+    """Move posts created before `cutoff`, with their votes, to the archive."""
+    moved = 0
+
+    while True:
+        post_ids: list[int] = list(
+            db.scalars(
+                select(models.Post.id)
+                .filter(
+                    models.Post.created_at < cutoff,
+                    # Deleted posts are left to the purge worker.
+                    models.Post.deleted_at.is_(None),
+                )
+                .order_by(models.Post.created_at)
+                .limit(batch_size)
+            )
+        )
+        if not post_ids:
+            return moved
+
+        now = models.utcnow()
+        db.execute(
+            insert(models.PostArchive).from_select(
+                [*ARCHIVED_COLUMNS, "archived_at"],
+                select(
+                    *(getattr(models.Post, column) for column in ARCHIVED_COLUMNS),
+                    literal(now),
+                ).filter(models.Post.id.in_(post_ids)),
+            )
+        )
+        db.execute(
+            insert(models.VoteArchive).from_select(
+                ["post_id", "user_id"],
+                select(models.Vote.post_id, models.Vote.user_id).filter(
+                    models.Vote.post_id.in_(post_ids)
+                ),
+            )
+        )
+        db.execute(delete(models.Vote).filter(models.Vote.post_id.in_(post_ids)))
+        db.execute(delete(models.Post).filter(models.Post.id.in_(post_ids)))
+        # Listings only cover live posts; user stats keep counting archived ones.
+        bump_counter(db, POSTS_COUNTER, -len(post_ids))
+        db.commit()
+
+        moved += len(post_ids)
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def next_month(day: date) -> date:
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def partition_name(month: date) -> str:
+    return f"p{month:%Y%m}"
+
+
+def partitions(conn: Connection) -> list[str]:
+    """Names of the partitions of `posts`, oldest first; empty if unpartitioned."""
+    return [
+        name
+        for (name,) in conn.execute(
+            text(
+                "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'posts' "
+                "AND PARTITION_NAME IS NOT NULL ORDER BY PARTITION_ORDINAL_POSITION"
+            )
+        )
+    ]
+
+
+def partition_clause(month: date) -> str:
+    return (
+        f"PARTITION {partition_name(month)} VALUES LESS THAN "
+        f"(TO_DAYS('{next_month(month):%Y-%m-%d}'))"
+    )
+
+
+def partition_posts(conn: Connection, months_ahead: int) -> None:
+    """Range-partition `posts` by month of `created_at` (MySQL only).
+
+    MySQL requires the partitioning column in the primary key and does not
+    allow foreign keys on partitioned tables, so the primary key becomes
+    (id, created_at) and the foreign keys from and to `posts` are dropped;
+    the app deletes votes itself rather than relying on the cascade, and
+    checks that the post still exists before committing a vote.
+    """
+    foreign_keys = conn.execute(
+        text(
+            "SELECT TABLE_NAME, CONSTRAINT_NAME "
+            "FROM information_schema.KEY_COLUMN_USAGE "
+            "WHERE TABLE_SCHEMA = DATABASE() AND REFERENCED_TABLE_NAME IS NOT NULL "
+            "AND (TABLE_NAME = 'posts' OR REFERENCED_TABLE_NAME = 'posts')"
+        )
+    ).all()
+    for table, constraint in foreign_keys:
+        conn.execute(text(f"ALTER TABLE {table} DROP FOREIGN KEY {constraint}"))
+
+    oldest = conn.scalar(text("SELECT MIN(created_at) FROM posts"))
+    month = month_start(oldest.date() if oldest else date.today())
+    last = month_start(date.today() + timedelta(days=31 * months_ahead))
+
+    clauses = []
+    while month <= last:
+        clauses.append(partition_clause(month))
+        month = next_month(month)
+    clauses.append("PARTITION pmax VALUES LESS THAN MAXVALUE")
+
+    conn.execute(
+        text(
+            "ALTER TABLE posts MODIFY created_at DATETIME NOT NULL "
+            "DEFAULT CURRENT_TIMESTAMP, DROP PRIMARY KEY, "
+            "ADD PRIMARY KEY (id, created_at)"
+        )
+    )
+    conn.execute(
+        text(
+            "ALTER TABLE posts PARTITION BY RANGE (TO_DAYS(created_at)) "
+            f"({', '.join(clauses)})"
+        )
+    )
+    conn.commit()
+
+
+def add_partitions(conn: Connection, months_ahead: int) -> None:
+    """Split `pmax` so the coming months each have their own partition."""
+    names = [name for name in partitions(conn) if name != "pmax"]
+    if not names:
+        return
+
+    latest = datetime.strptime(names[-1], "p%Y%m").date()
+    last = month_start(date.today() + timedelta(days=31 * months_ahead))
+    clauses = []
+    month = next_month(latest)
+    while month <= last:
+        clauses.append(partition_clause(month))
+        month = next_month(month)
+
+    if clauses:
+        clauses.append("PARTITION pmax VALUES LESS THAN MAXVALUE")
+        conn.execute(
+            text(
+                "ALTER TABLE posts REORGANIZE PARTITION pmax "
+                f"INTO ({', '.join(clauses)})"
+            )
+        )
+        conn.commit()
+
+
+def drop_empty_partitions(conn: Connection, cutoff: datetime) -> list[str]:
+    """Drop the partitions entirely before `cutoff` that no longer hold rows."""
+    dropped = []
+    for name in partitions(conn):
+        if name == "pmax":
+            continue
+        if next_month(datetime.strptime(name, "p%Y%m").date()) > cutoff.date():
+            break
+        if conn.scalar(text(f"SELECT 1 FROM posts PARTITION ({name}) LIMIT 1")):
+            # Still holds deleted posts waiting for the purge worker.
+            continue
+        conn.execute(text(f"ALTER TABLE posts DROP PARTITION {name}"))
+        dropped.append(name)
+    conn.commit()
+    return dropped
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Partition and archive posts.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    partition = commands.add_parser("partition", help="partition posts by month")
+    partition.add_argument("--months-ahead", type=int, default=3)
+
+    archive = commands.add_parser("archive", help="move cold posts to the archive")
+    archive.add_argument("--older-than-days", type=int, default=180)
+    archive.add_argument("--batch-size", type=int, default=1000)
+    archive.add_argument("--months-ahead", type=int, default=3)
+    args = parser.parse_args()
+
+    models.Base.metadata.create_all(bind=engine)
+    mysql = engine.dialect.name == "mysql"
+
+    if args.command == "partition":
+        if not mysql:
+            parser.error("partitioning is only supported on MySQL")
+        with engine.connect() as conn:
+            if partitions(conn):
+                parser.error("posts is already partitioned")
+            partition_posts(conn, args.months_ahead)
+        print("Partitioned posts by month")
+        return
+
+    cutoff = models.utcnow() - timedelta(days=args.older_than_days)
+    with SessionLocal() as db:
+        moved = archive_posts(db, cutoff, args.batch_size)
+    print(f"Archived {moved} posts created before {cutoff:%Y-%m-%d}")
+
+    if mysql:
+        with engine.connect() as conn:
+            if partitions(conn):
+                for name in drop_empty_partitions(conn, cutoff):
+                    print(f"Dropped partition {name}")
+                add_partitions(conn, args.months_ahead)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Iterable, NamedTuple
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session, object_session
+
+from . import models
+from .config import get_settings
+from .database import SessionLocal
+from .polling import PollingWorker
+
+settings = get_settings()
+
+# Session.info key of the users updated in the session's transaction.
+UPDATED_USERS = "author_cache.updated_users"
+
+
+class Author(NamedTuple):
+    """The user fields embedded in every post response."""
+
+    username: str
+    email: str
+    created_at: datetime
+    modified_at: datetime
+
+
+class AuthorCache:
+    """Bounded LRU of post authors by user id, so post reads skip `users`.
+
+    Users changed through this worker's ORM sessions are dropped when their
+    transaction commits; changes made elsewhere are dropped by the next
+    `sync`.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._authors: OrderedDict[int, Author] = OrderedDict()
+        self._synced_at: datetime | None = None
+        # Users modified exactly at `_synced_at` that have been handled.
+        self._synced_ids: set[int] = set()
+        # Bumped whenever users are dropped, so a load that may have read a
+        # user before its change is not cached.
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get_many(self, db: Session, user_ids: Iterable[int]) -> dict[int, Author]:
+        """Authors of the given users, loading the missing ones in one query.
+
+        Users that no longer exist are left out of the result.
+        """
+        found: dict[int, Author] = {}
+        missing: list[int] = []
+        with self._lock:
+            for user_id in set(user_ids):
+                author = self._authors.get(user_id)
+                if author is None:
+                    missing.append(user_id)
+                else:
+                    self._authors.move_to_end(user_id)
+                    found[user_id] = author
+            self.hits += len(found)
+            self.misses += len(missing)
+            generation = self._generation
+
+        if not missing:
+            return found
+
+        rows = db.execute(
+            select(
+                models.User.id,
+                models.User.username,
+                models.User.email,
+                models.User.created_at,
+                models.User.modified_at,
+            ).filter(models.User.id.in_(missing))
+        ).all()
+
+        with self._lock:
+            cache = generation == self._generation
+            for user_id, *fields in rows:
+                author = found[user_id] = Author(*fields)
+                if cache:
+                    self._authors[user_id] = author
+            while len(self._authors) > self.max_size:
+                self._authors.popitem(last=False)
+
+        return found
+
+    def invalidate(self, user_id: int) -> None:
+        """Drop a user whose username, email or timestamps have changed."""
+        with self._lock:
+            self._authors.pop(user_id, None)
+            self._generation += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._authors.clear()
+
+    def sync(self, db: Session) -> None:
+        """Drop the users modified since the previous sync."""
+        if self._synced_at is None:
+            self._synced_at = db.scalar(select(func.max(models.User.modified_at)))
+            return
+
+        # `>=` because timestamps may only have second resolution, so the users
+        # at the previous high-water mark come back every time. Dropping them
+        # again is harmless, but in-flight loads are only invalidated for new
+        # changes or users actually dropped from the cache.
+        rows = db.execute(
+            select(models.User.id, models.User.modified_at).filter(
+                models.User.modified_at >= self._synced_at
+            )
+        ).all()
+        if not rows:
+            return
+
+        changed = [
+            (user_id, modified_at)
+            for user_id, modified_at in rows
+            if modified_at > self._synced_at or user_id not in self._synced_ids
+        ]
+        with self._lock:
+            dropped = [
+                user_id
+                for user_id, _ in rows
+                if self._authors.pop(user_id, None) is not None
+            ]
+            if changed or dropped:
+                self._generation += 1
+
+        if changed:
+            latest = max(modified_at for _, modified_at in changed)
+            if latest > self._synced_at:
+                self._synced_at, self._synced_ids = latest, set()
+            self._synced_ids.update(
+                user_id for user_id, modified_at in changed if modified_at == latest
+            )
+
+    def stats(self) -> dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._authors),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+authors = AuthorCache(settings.AUTHOR_CACHE_SIZE)
+
+
+@event.listens_for(models.User, "after_update")
+def remember_updated_user(_mapper: Any, _connection: Any, user: models.User) -> None:
+    # Dropped only after the commit; before it, a concurrent read would load
+    # and cache the old row again.
+    session = object_session(user)
+    if session is not None:
+        session.info.setdefault(UPDATED_USERS, set()).add(user.id)
+
+
+@event.listens_for(Session, "after_commit")
+def invalidate_updated_users(session: Session) -> None:
+    for user_id in session.info.pop(UPDATED_USERS, ()):
+        authors.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def forget_updated_users(session: Session) -> None:
+    session.info.pop(UPDATED_USERS, None)
+
+
+def sync_authors() -> None:
+    with SessionLocal() as db:
+        authors.sync(db)
+
+
+# Drops the authors changed by other workers.
+worker = PollingWorker("author-cache", settings.AUTHOR_CACHE_SYNC_SECONDS, sync_authors)
@@ -0,0 +1,170 @@
+import asyncio
+import importlib
+import threading
+from typing import Callable, Iterable, Protocol
+
+from .config import get_settings
+
+settings = get_settings()
+
+Deliver = Callable[[int, int], None]
+
+
+class Transport(Protocol):
+    """Carries like-count changes between the workers serving the app.
+
+    A transport receives every local `publish` and must call the `deliver`
+    callback given to `start` once for every change, including those published
+    by other workers.
+    """
+
+    def start(self, deliver: Deliver) -> None: ...
+
+    def publish(self, post_id: int, delta: int) -> None: ...
+
+    def stop(self) -> None: ...
+
+
+class LocalTransport:
+    """Delivers updates within this process only."""
+
+    def __init__(self) -> None:
+        self._deliver: Deliver | None = None
+
+    def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+
+    def publish(self, post_id: int, delta: int) -> None:
+        if self._deliver is not None:
+            self._deliver(post_id, delta)
+
+    def stop(self) -> None:
+        self._deliver = None
+
+
+class Subscription:
+    """Like-count updates for one connection."""
+
+    __slots__ = ("post_ids", "likes", "queue", "closed")
+
+    def __init__(self, likes: dict[int, int], max_queue: int) -> None:
+        self.post_ids = frozenset(likes)
+        # Like counts the subscriber starts from.
+        self.likes = likes
+        self.queue: asyncio.Queue[dict[int, int]] = asyncio.Queue(max_queue)
+        self.closed = False
+
+
+class Broker:
+    """In-process pub/sub for like counts.
+
+    Votes are published as +1/-1 changes, which are applied to the count of
+    each followed post, seeded from the database by its first subscriber.
+    Updates are coalesced: only the latest count of each post is kept until
+    the next flush, which fans one batch out to every interested subscriber.
+    A subscriber whose queue is full is dropped rather than buffered.
+    """
+
+    def __init__(
+        self,
+        transport: Transport,
+        flush_interval: float = 0.1,
+        max_queue: int = 32,
+    ) -> None:
+        self.transport = transport
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.dropped = 0
+        self._subscribers: dict[int, set[Subscription]] = {}
+        self._likes: dict[int, int] = {}
+        self._pending: dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._flusher: asyncio.Task | None = None
+
+    def publish(self, post_id: int, delta: int) -> None:
+        """Publish a change of a like count; safe to call from any thread."""
+        self.transport.publish(post_id, delta)
+
+    def _receive(self, post_id: int, delta: int) -> None:
+        with self._lock:
+            # Changes of posts nobody here follows are not needed.
+            if post_id in self._likes:
+                self._likes[post_id] += delta
+                self._pending[post_id] = self._likes[post_id]
+
+    def subscribe(self, likes: Iterable[tuple[int, int]]) -> Subscription:
+        """Follow posts given with their current like counts.
+
+        Posts that are already followed keep the count maintained here, so all
+        their subscribers see the same values.
+        """
+        with self._lock:
+            current = {
+                post_id: self._likes.setdefault(post_id, count)
+                for post_id, count in likes
+            }
+        subscription = Subscription(current, self.max_queue)
+        for post_id in subscription.post_ids:
+            self._subscribers.setdefault(post_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscription.closed = True
+        for post_id in subscription.post_ids:
+            subscribers = self._subscribers.get(post_id)
+            if subscribers is None:
+                continue
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[post_id]
+                with self._lock:
+                    self._likes.pop(post_id, None)
+
+    def flush(self) -> None:
+        """Fan the pending updates out to their subscribers."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+
+        batches: dict[Subscription, dict[int, int]] = {}
+        for post_id, likes in pending.items():
+            for subscription in self._subscribers.get(post_id, ()):
+                batches.setdefault(subscription, {})[post_id] = likes
+
+        for subscription, batch in batches.items():
+            try:
+                subscription.queue.put_nowait(batch)
+            except asyncio.QueueFull:
+                # A consumer this far behind is dropped; it can reconnect.
+                self.unsubscribe(subscription)
+                self.dropped += 1
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            self.flush()
+
+    def start(self) -> None:
+        self.transport.start(self._receive)
+        self._flusher = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self) -> None:
+        if self._flusher is not None:
+            self._flusher.cancel()
+            self._flusher = None
+        self.transport.stop()
+
+
+def load_transport(path: str) -> Transport:
+    """Instantiate a transport given as `module:Class`, or the local one."""
+    if not path:
+        return LocalTransport()
+
+    module_name, _, class_name = path.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+broker = Broker(
+    load_transport(settings.LIKES_TRANSPORT),
+    flush_interval=settings.LIKES_FLUSH_SECONDS,
+    max_queue=settings.LIKES_QUEUE_SIZE,
+)
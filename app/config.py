@@ -1,4 +1,5 @@
 from functools import lru_cache
+from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -8,10 +9,56 @@ class Settings(BaseSettings):
     DB_PASSWORD: str = "null"
     DB_HOST: str = "localhost"
     DB_NAME: str = "test_db"
+    # Overrides the MySQL URL built from the DB_* settings when set.
+    DATABASE_URL: str = ""
+    # Connections each worker may open, and the most the database should see
+    # from all workers together; app.serve sizes the worker count from these.
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_MAX_CONNECTIONS: int = 150
+    # "raw" serves the hot post reads without the ORM, see app/raw_reads.py.
+    READ_ENGINE: Literal["orm", "raw"] = "orm"
 
     SECRET_KEY: str = ""
     ALGORITHM: str = ""
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 0
+    REVOCATION_SYNC_SECONDS: float = 2.0
+    # Revocations committed this long after they were stamped are still seen.
+    REVOCATION_SYNC_OVERLAP_SECONDS: float = 60.0
+    REVOCATION_PRUNE_SECONDS: float = 600.0
+
+    # Votes of deleted posts are removed in chunks, pausing between chunks.
+    PURGE_CHUNK_SIZE: int = 1000
+    PURGE_PAUSE_SECONDS: float = 0.05
+    PURGE_POLL_SECONDS: float = 5.0
+    PURGE_LEASE_SECONDS: float = 60.0
+
+    # Live like counts: `module:Class` of the cross-worker transport,
+    # coalescing interval and per-connection queue. Empty means in-process
+    # only, where streams miss the votes handled by other workers; set
+    # "app.like_events:DatabaseTransport" when running more than one worker.
+    LIKES_TRANSPORT: str = ""
+    LIKES_FLUSH_SECONDS: float = 0.1
+    LIKES_QUEUE_SIZE: int = 32
+    LIKES_MAX_POSTS_PER_STREAM: int = 100
+    # DatabaseTransport polling; rows committed this long after they were
+    # stamped are still seen.
+    LIKES_POLL_SECONDS: float = 0.5
+    LIKES_POLL_OVERLAP_SECONDS: float = 5.0
+    LIKES_EVENT_RETENTION_SECONDS: float = 60.0
+
+    # Filtered listing totals are estimated from this many most recent posts.
+    COUNT_SAMPLE_SIZE: int = 10_000
+
+    # Username autocomplete falls back to the database above this many users.
+    USERNAME_INDEX_MAX_SIZE: int = 2_000_000
+    USERNAME_INDEX_SYNC_SECONDS: float = 5.0
+    USERNAME_INDEX_SYNC_OVERLAP: int = 1000
+
+    # Authors embedded in post responses are cached per worker; other workers'
+    # changes to users are picked up every sync.
+    AUTHOR_CACHE_SIZE: int = 100_000
+    AUTHOR_CACHE_SYNC_SECONDS: float = 2.0
 
     model_config = SettingsConfigDict(env_file=".env")
 
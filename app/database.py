@@ -9,9 +9,19 @@ from .config import get_settings
 settings = get_settings()
 encoded_password = urllib.parse.quote_plus(settings.DB_PASSWORD)
 
-DATABASE_URL = f"mysql://{settings.DB_USERNAME}:{encoded_password}@{settings.DB_HOST}/{settings.DB_NAME}"
-
-engine = create_engine(DATABASE_URL)
+DATABASE_URL = (
+    settings.DATABASE_URL
+    or f"mysql://{settings.DB_USERNAME}:{encoded_password}@{settings.DB_HOST}/{settings.DB_NAME}"
+)
+
+# SQLite's in-memory pools take no sizing options.
+pool_options = (
+    {}
+    if DATABASE_URL.startswith("sqlite")
+    else {"pool_size": settings.DB_POOL_SIZE, "max_overflow": settings.DB_MAX_OVERFLOW}
+)
+
+engine = create_engine(DATABASE_URL, **pool_options)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
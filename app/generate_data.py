@@ -0,0 +1,272 @@
+"""Fill the database with a synthetic dataset for scale testing.
+
+    python -m app.generate_data --users 1000000 --posts 10000000 --votes 100000000
+
+Authors of posts and the number of votes each post gets follow a Zipf
+distribution, so a few users and posts are far more popular than the rest.
+Rows are written with batched executemany inserts, which the MySQL and
+SQLite drivers turn into multi-row inserts. Secondary indexes are dropped
+while loading and rebuilt at the end.
+"""
+
+import argparse
+import bisect
+import itertools
+import math
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Iterator
+
+from sqlalchemy import Connection, Table, func, insert, select, text
+
+from . import models, stats, utils
+from .database import SessionLocal, engine
+
+WORDS = (
+    "python fastapi database index query cache async worker mysql sqlite "
+    "vote post user feed search token stream stats scale bench"
+).split()
+
+TABLES: tuple[Table, ...] = (
+    models.User.__table__,
+    models.Post.__table__,
+    models.Vote.__table__,
+)
+
+
+class Permutation:
+    """Cheap fixed shuffle of range(n), so popularity is not tied to id order."""
+
+    def __init__(self, n: int, rng: random.Random) -> None:
+        self.n = n
+        self.offset = rng.randrange(n)
+        self.step = rng.randrange(1, n) if n > 1 else 1
+        while math.gcd(self.step, n) != 1:
+            self.step += 1
+
+    def __getitem__(self, index: int) -> int:
+        return (index * self.step + self.offset) % self.n
+
+
+def zipf_weights(n: int, exponent: float) -> Iterator[float]:
+    return (1 / rank**exponent for rank in range(1, n + 1))
+
+
+def next_id(conn: Connection, table: Table) -> int:
+    return (conn.scalar(select(func.max(table.c.id))) or 0) + 1
+
+
+def prepare(conn: Connection) -> None:
+    """Relax integrity checks and drop secondary indexes for the load."""
+    if conn.dialect.name == "mysql":
+        conn.execute(text("SET SESSION unique_checks = 0"))
+        conn.execute(text("SET SESSION foreign_key_checks = 0"))
+    elif conn.dialect.name == "sqlite":
+        conn.execute(text("PRAGMA foreign_keys = OFF"))
+        conn.execute(text("PRAGMA synchronous = OFF"))
+        conn.execute(text("PRAGMA journal_mode = MEMORY"))
+
+    for table in TABLES:
+        for index in table.indexes:
+            index.drop(conn, checkfirst=True)
+    conn.commit()
+
+
+def finish(conn: Connection) -> None:
+    for table in TABLES:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+    if conn.dialect.name == "mysql":
+        conn.execute(text("SET SESSION unique_checks = 1"))
+        conn.execute(text("SET SESSION foreign_key_checks = 1"))
+    elif conn.dialect.name == "sqlite":
+        conn.execute(text("PRAGMA foreign_keys = ON"))
+    conn.commit()
+
+
+def load(conn: Connection, table: Table, rows: Iterator[dict], batch_size: int) -> int:
+    """Insert rows in batches, committing after each one."""
+    count = 0
+    while batch := list(itertools.islice(rows, batch_size)):
+        conn.execute(insert(table), batch)
+        conn.commit()
+        count += len(batch)
+    return count
+
+
+def generate_users(first_id: int, count: int, now: datetime) -> Iterator[dict]:
+    # Hashing is deliberately slow, so every user shares one password hash.
+    password = utils.hash("password")
+    for user_id in range(first_id, first_id + count):
+        yield {
+            "id": user_id,
+            "username": f"user{user_id}",
+            "email": f"user{user_id}@example.com",
+            "password": password,
+            "created_at": now,
+            "modified_at": now,
+        }
+
+
+def generate_posts(
+    first_id: int,
+    count: int,
+    author_ids: list[int],
+    author_weights: list[float],
+    start: datetime,
+    span: timedelta,
+    rng: random.Random,
+) -> Iterator[dict]:
+    for index, post_id in enumerate(range(first_id, first_id + count)):
+        rank = bisect.bisect(author_weights, rng.random() * author_weights[-1])
+        # Posts get older as ids get smaller, as they would in production.
+        created_at = start + span * (index / count)
+        yield {
+            "id": post_id,
+            "title": f"{rng.choice(WORDS)} {rng.choice(WORDS)} {post_id}",
+            "content": " ".join(rng.choices(WORDS, k=12)),
+            "published": rng.random() < 0.9,
+            "rating": 0,
+            "user_id": author_ids[min(rank, len(author_ids) - 1)],
+            "created_at": created_at,
+            "modified_at": created_at,
+        }
+
+
+def generate_votes(
+    post_ids: range,
+    user_ids: range,
+    count: int,
+    exponent: float,
+    rng: random.Random,
+) -> Iterator[dict]:
+    """Spread `count` votes over posts by Zipf rank, each voter once per post."""
+    total_weight = sum(zipf_weights(len(post_ids), exponent))
+    order = Permutation(len(post_ids), rng)
+    expected = 0.0
+    assigned = 0
+    last_rank = len(post_ids) - 1
+
+    for rank, weight in enumerate(zipf_weights(len(post_ids), exponent)):
+        # Votes a post cannot take (more than there are users) carry over, and
+        # the last post takes what rounding left, so exactly `count` are made.
+        expected += count * weight / total_weight
+        target = count if rank == last_rank else round(expected)
+        votes = min(target - assigned, len(user_ids))
+        if votes <= 0:
+            continue
+
+        post_id = post_ids[order[rank]]
+        for voter in rng.sample(user_ids, votes):
+            yield {"post_id": post_id, "user_id": voter}
+
+        assigned += votes
+        if assigned >= count:
+            return
+
+
+def report(name: str, rows: int, elapsed: float) -> None:
+    rate = rows / elapsed if elapsed else 0
+    print(f"{name:>16}: {rows:>12,} rows in {elapsed:8.1f}s ({rate:>10,.0f} rows/s)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic dataset for scale testing."
+    )
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--posts", type=int, default=100_000)
+    parser.add_argument("--votes", type=int, default=1_000_000)
+    parser.add_argument(
+        "--zipf", type=float, default=1.1, help="Zipf exponent of post popularity"
+    )
+    parser.add_argument(
+        "--days", type=int, default=365, help="spread posts over this many days"
+    )
+    parser.add_argument("--batch-size", type=int, default=5_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--skip-reconcile",
+        action="store_true",
+        help="leave the user_stats and counters tables stale",
+    )
+    args = parser.parse_args()
+
+    if min(args.users, args.posts, args.batch_size) < 1 or args.votes < 0:
+        parser.error("--users, --posts and --batch-size must be positive")
+    if args.votes > args.users * args.posts:
+        parser.error("--votes cannot exceed one vote per user and post")
+
+    rng = random.Random(args.seed)
+    models.Base.metadata.create_all(bind=engine)
+    now = models.utcnow()
+    started = time.perf_counter()
+
+    with engine.connect() as conn:
+        prepare(conn)
+        try:
+            first_user = next_id(conn, models.User.__table__)
+            first_post = next_id(conn, models.Post.__table__)
+            user_ids = range(first_user, first_user + args.users)
+            post_ids = range(first_post, first_post + args.posts)
+
+            start = time.perf_counter()
+            rows = load(
+                conn,
+                models.User.__table__,
+                generate_users(first_user, args.users, now),
+                args.batch_size,
+            )
+            report("users", rows, time.perf_counter() - start)
+
+            authors = Permutation(args.users, rng)
+            author_ids = [user_ids[authors[rank]] for rank in range(args.users)]
+            author_weights = list(
+                itertools.accumulate(zipf_weights(args.users, args.zipf))
+            )
+            start = time.perf_counter()
+            rows = load(
+                conn,
+                models.Post.__table__,
+                generate_posts(
+                    first_post,
+                    args.posts,
+                    author_ids,
+                    author_weights,
+                    now - timedelta(days=args.days),
+                    timedelta(days=args.days),
+                    rng,
+                ),
+                args.batch_size,
+            )
+            report("posts", rows, time.perf_counter() - start)
+
+            start = time.perf_counter()
+            rows = load(
+                conn,
+                models.Vote.__table__,
+                generate_votes(post_ids, user_ids, args.votes, args.zipf, rng),
+                args.batch_size,
+            )
+            report("votes", rows, time.perf_counter() - start)
+        finally:
+            # Rebuild the indexes even when the load fails or is interrupted.
+            conn.rollback()
+            start = time.perf_counter()
+            finish(conn)
+            print(f"{'rebuild indexes':>16}: {time.perf_counter() - start:8.1f}s")
+
+    if not args.skip_reconcile:
+        start = time.perf_counter()
+        with SessionLocal() as db:
+            stats.reconcile_user_stats(db)
+            stats.reconcile_post_total(db)
+        print(f"{'reconcile stats':>16}: {time.perf_counter() - start:8.1f}s")
+
+    print(f"{'total':>16}: {time.perf_counter() - started:8.1f}s")
+
+
+if __name__ == "__main__":
+    main()
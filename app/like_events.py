@@ -0,0 +1,107 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select
+
+from . import models
+from .broker import Deliver
+from .config import get_settings
+from .database import SessionLocal
+from .polling import PollingWorker
+
+settings = get_settings()
+
+
+class DatabaseTransport:
+    """Carries like-count changes between workers through `like_events`.
+
+    `publish` inserts a row and delivers the change locally at once; the
+    other workers pick it up with their next poll. Every poll re-reads the
+    rows of the last LIKES_POLL_OVERLAP_SECONDS, so rows committed out of
+    order are not missed, and skips the ids it has already delivered. Rows
+    older than LIKES_EVENT_RETENTION_SECONDS are deleted.
+
+        LIKES_TRANSPORT=app.like_events:DatabaseTransport
+    """
+
+    def __init__(self) -> None:
+        self._deliver: Deliver | None = None
+        # Ids delivered within the overlap window, with their timestamps.
+        self._seen: dict[int, datetime] = {}
+        self._polled_at = models.utcnow()
+        self._pruned_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._worker = PollingWorker(
+            "like-events", settings.LIKES_POLL_SECONDS, self.poll
+        )
+
+    def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+        # Only changes made from now on are of interest.
+        self._polled_at = models.utcnow()
+        self._worker.start()
+
+    def publish(self, post_id: int, delta: int) -> None:
+        with SessionLocal() as db:
+            event = models.LikeEvent(post_id=post_id, delta=delta)
+            db.add(event)
+            db.flush()
+            # Marked before the commit, so a concurrent poll cannot deliver
+            # the row a second time.
+            with self._lock:
+                self._seen[event.id] = event.created_at
+            db.commit()
+
+        if self._deliver is not None:
+            self._deliver(post_id, delta)
+
+    def poll(self) -> None:
+        overlap = timedelta(seconds=settings.LIKES_POLL_OVERLAP_SECONDS)
+        with SessionLocal() as db:
+            rows = db.execute(
+                select(
+                    models.LikeEvent.id,
+                    models.LikeEvent.post_id,
+                    models.LikeEvent.delta,
+                    models.LikeEvent.created_at,
+                )
+                .filter(models.LikeEvent.created_at >= self._polled_at - overlap)
+                .order_by(models.LikeEvent.id)
+            ).all()
+
+            changes: list[tuple[int, int]] = []
+            with self._lock:
+                for event_id, post_id, delta, created_at in rows:
+                    if event_id not in self._seen:
+                        self._seen[event_id] = created_at
+                        changes.append((post_id, delta))
+                    self._polled_at = max(self._polled_at, created_at)
+
+                # Older rows are no longer read back, so need not be tracked.
+                cutoff = self._polled_at - overlap
+                self._seen = {
+                    event_id: created_at
+                    for event_id, created_at in self._seen.items()
+                    if created_at >= cutoff
+                }
+
+            deliver = self._deliver
+            if deliver is not None:
+                for post_id, delta in changes:
+                    deliver(post_id, delta)
+
+            retention = settings.LIKES_EVENT_RETENTION_SECONDS
+            if time.monotonic() - self._pruned_at > retention:
+                db.execute(
+                    delete(models.LikeEvent).filter(
+                        models.LikeEvent.created_at
+                        < models.utcnow() - timedelta(seconds=retention)
+                    )
+                )
+                db.commit()
+                self._pruned_at = time.monotonic()
+
+    def stop(self) -> None:
+        self._worker.stop()
+        self._deliver = None
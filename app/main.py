@@ -3,16 +3,27 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from . import models
+from . import author_cache, broker, models, purge, revocation, username_index
 from .database import engine
+from .singleflight import post_reads
 from .routers import auth, post, user, vote
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Ensure database tables are created at startup."""
+    """Ensure database tables are created and run the background workers."""
     models.Base.metadata.create_all(bind=engine)
+    purge.worker.start()
+    revocation.worker.start()
+    username_index.worker.start()
+    author_cache.worker.start()
+    broker.broker.start()
     yield
+    broker.broker.stop()
+    author_cache.worker.stop()
+    username_index.worker.stop()
+    revocation.worker.stop()
+    purge.worker.stop()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -36,3 +47,15 @@ app.include_router(vote.router)
 @app.get("/")
 def root():
     return {"message": "Hello World"}
+
+
+@app.get("/metrics/coalescing")
+def coalescing_metrics():
+    """Get how many post reads shared another request's query."""
+    return post_reads.stats()
+
+
+@app.get("/metrics/author_cache")
+def author_cache_metrics():
+    """Get the size and hit ratio of the cache of post authors."""
+    return author_cache.authors.stats()
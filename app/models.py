@@ -1,13 +1,22 @@
 from datetime import datetime, timezone
+from typing import Optional
 
 from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String, func
+from sqlalchemy.dialects import mysql
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .database import Base
 
 
+def utcnow() -> datetime:
+    """Timestamp assigned on the app side so inserts need no read-back."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 class Post(Base):
     __tablename__ = "posts"
+    # Never reuse the ids of posts moved to the archive.
+    __table_args__ = {"sqlite_autoincrement": True}
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     title: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -15,12 +24,17 @@ class Post(Base):
     published: Mapped[bool] = mapped_column(Boolean, default=True)
     rating: Mapped[int] = mapped_column(Integer, default=0)
     created_at: Mapped[datetime] = mapped_column(
-        DateTime, server_default=func.current_timestamp()
+        DateTime, default=utcnow, server_default=func.current_timestamp(), index=True
     )
     modified_at: Mapped[datetime] = mapped_column(
         DateTime,
+        default=utcnow,
         server_default=func.current_timestamp(),
-        onupdate=func.current_timestamp(),
+        onupdate=utcnow,
+    )
+    # Set when the post is deleted; the row stays until its votes are purged.
+    deleted_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime, nullable=True, index=True
     )
 
     user_id: Mapped[int] = mapped_column(
@@ -41,10 +55,12 @@ class User(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime, server_default=func.current_timestamp()
     )
+    # Indexed for the author cache's sync, which polls for changed users.
     modified_at: Mapped[datetime] = mapped_column(
         DateTime,
         server_default=func.current_timestamp(),
         onupdate=func.current_timestamp(),
+        index=True,
     )
 
     posts = relationship("Post", back_populates="user")
@@ -60,3 +76,109 @@ class Vote(Base):
         ForeignKey("users.id", ondelete="CASCADE"),
         primary_key=True,
     )
+
+
+class PostArchive(Base):
+    """Posts moved out of `posts` by the archive job; read-only."""
+
+    __tablename__ = "posts_archive"
+    __table_args__ = {"mysql_row_format": "COMPRESSED"}
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    title: Mapped[str] = mapped_column(String(255), nullable=False)
+    content: Mapped[str] = mapped_column(String(500), nullable=False)
+    published: Mapped[bool] = mapped_column(Boolean, default=True)
+    rating: Mapped[int] = mapped_column(Integer, default=0)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    modified_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow)
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE", onupdate="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+
+    user = relationship("User")
+
+
+class VoteArchive(Base):
+    """Votes of archived posts."""
+
+    __tablename__ = "votes_archive"
+    __table_args__ = {"mysql_row_format": "COMPRESSED"}
+
+    post_id: Mapped[int] = mapped_column(
+        ForeignKey("posts_archive.id", ondelete="CASCADE"), primary_key=True
+    )
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+
+
+class UserStats(Base):
+    """Counters kept up to date by the post and vote routes."""
+
+    __tablename__ = "user_stats"
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    post_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    likes_received: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+
+class Counter(Base):
+    """Named site-wide counters, such as the number of posts."""
+
+    __tablename__ = "counters"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    value: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+
+class PostPurge(Base):
+    """Progress of removing a soft-deleted post and its votes."""
+
+    __tablename__ = "post_purges"
+
+    post_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    votes_deleted: Mapped[int] = mapped_column(Integer, default=0)
+    requested_at: Mapped[datetime] = mapped_column(
+        DateTime, default=utcnow, server_default=func.current_timestamp()
+    )
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    # The worker running the purge, which renews its lease with every chunk.
+    claimed_by: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    claimed_until: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+
+class RevokedToken(Base):
+    """A revoked token (`jti` set), or all of a user's tokens up to `revoked_at`."""
+
+    __tablename__ = "revoked_tokens"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    jti: Mapped[Optional[str]] = mapped_column(String(36), unique=True, nullable=True)
+    user_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Sub-second precision, so a login right after a logout of all sessions
+    # is not revoked along with them.
+    revoked_at: Mapped[datetime] = mapped_column(
+        DateTime().with_variant(mysql.DATETIME(fsp=6), "mysql"),
+        default=utcnow,
+        index=True,
+    )
+    # Once every affected token has expired the row can be pruned.
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
+
+
+class LikeEvent(Base):
+    """A change of a post's like count, read by the other workers' streams."""
+
+    __tablename__ = "like_events"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    post_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    delta: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow, index=True)
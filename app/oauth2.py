@@ -1,3 +1,4 @@
+import uuid
 from datetime import datetime, timedelta, timezone
 
 import jwt
@@ -8,6 +9,7 @@ from sqlalchemy.orm import Session
 
 from . import database, schemas
 from .config import get_settings
+from .revocation import revocations
 
 settings = get_settings()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
@@ -16,10 +18,17 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 def create_access_token(data: dict):
     to_encode = data.copy()
 
-    expire = datetime.now(timezone.utc) + timedelta(
-        minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
+    now = datetime.now(timezone.utc)
+    expire = now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    to_encode.update(
+        {
+            "exp": expire,
+            "iat": now,
+            # `iat` only has whole seconds; revocations compare milliseconds.
+            "iat_ms": int(now.timestamp() * 1000),
+            "jti": uuid.uuid4().hex,
+        }
     )
-    to_encode.update({"exp": expire})
 
     encoded_jwt = jwt.encode(
         to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
@@ -38,7 +47,16 @@ def verify_access_token(token: str, credentials_exception) -> schemas.TokenData:
         if id is None:
             raise credentials_exception
 
-        token_data = schemas.TokenData(id=id)
+        jti: str | None = payload.get("jti")
+        iat: int | None = payload.get("iat")
+        issued_ms: int | None = payload.get("iat_ms")
+        if issued_ms is None and iat is not None:
+            issued_ms = iat * 1000
+
+        if revocations.is_revoked(jti, int(id), issued_ms):
+            raise credentials_exception
+
+        token_data = schemas.TokenData(id=id, jti=jti, iat=iat, exp=payload.get("exp"))
 
     except InvalidTokenError:
         raise credentials_exception
@@ -0,0 +1,43 @@
+import threading
+from typing import Callable
+
+
+class PollingWorker:
+    """Calls `poll` in a daemon thread every `interval` seconds.
+
+    A failing poll is logged and retried at the next interval. `start` can be
+    called again after `stop`, which gives it a fresh thread.
+    """
+
+    def __init__(self, name: str, interval: float, poll: Callable[[], None]) -> None:
+        self.name = name
+        self.interval = interval
+        self.poll = poll
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+
+    def start(self) -> None:
+        self._wakeup, self._stopped = threading.Event(), threading.Event()
+        threading.Thread(
+            target=self._run,
+            args=(self._wakeup, self._stopped),
+            name=self.name,
+            daemon=True,
+        ).start()
+
+    def wake(self) -> None:
+        """Poll now instead of waiting for the rest of the interval."""
+        self._wakeup.set()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._wakeup.set()
+
+    def _run(self, wakeup: threading.Event, stopped: threading.Event) -> None:
+        while not stopped.is_set():
+            wakeup.clear()
+            try:
+                self.poll()
+            except Exception as error:
+                print(f"{self.name} failed: {error}")
+            wakeup.wait(self.interval)
@@ -0,0 +1,122 @@
+import os
+import socket
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.orm import Session
+
+from . import models
+from .config import get_settings
+from .database import SessionLocal
+from .polling import PollingWorker
+
+settings = get_settings()
+
+
+def worker_id() -> str:
+    # Taken per call, since the launcher forks workers after importing this.
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def lease_end() -> datetime:
+    return models.utcnow() + timedelta(seconds=settings.PURGE_LEASE_SECONDS)
+
+
+def claim(db: Session, post_id: int, owner: str) -> bool:
+    """Lease a pending purge to `owner` unless another worker holds it."""
+    result = db.execute(
+        update(models.PostPurge)
+        .filter(
+            models.PostPurge.post_id == post_id,
+            models.PostPurge.completed_at.is_(None),
+            or_(
+                models.PostPurge.claimed_until.is_(None),
+                models.PostPurge.claimed_until < models.utcnow(),
+            ),
+        )
+        .values(claimed_by=owner, claimed_until=lease_end())
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def purge_post(db: Session, post_id: int, owner: str) -> None:
+    """Delete the votes of a soft-deleted post in chunks, then the post itself.
+
+    Every chunk is committed on its own so locks are held briefly, and the
+    progress lives in `post_purges`, so a purge interrupted by a crash simply
+    continues from whatever votes are left once its lease has run out. Each
+    chunk is committed together with a renewal of the lease, and rolled back
+    if another worker has taken the purge over.
+    """
+    while True:
+        user_ids: list[int] = list(
+            db.scalars(
+                select(models.Vote.user_id)
+                .filter(models.Vote.post_id == post_id)
+                .limit(settings.PURGE_CHUNK_SIZE)
+            )
+        )
+
+        if user_ids:
+            result = db.execute(
+                delete(models.Vote).filter(
+                    models.Vote.post_id == post_id,
+                    models.Vote.user_id.in_(user_ids),
+                )
+            )
+            progress = {
+                "votes_deleted": models.PostPurge.votes_deleted + result.rowcount
+            }
+        else:
+            db.execute(delete(models.Post).filter(models.Post.id == post_id))
+            progress = {"completed_at": models.utcnow()}
+
+        renewed = db.execute(
+            update(models.PostPurge)
+            .filter(
+                models.PostPurge.post_id == post_id,
+                models.PostPurge.claimed_by == owner,
+            )
+            .values(claimed_until=lease_end(), **progress)
+        )
+        if renewed.rowcount != 1:
+            db.rollback()
+            return
+        db.commit()
+
+        if not user_ids:
+            return
+        time.sleep(settings.PURGE_PAUSE_SECONDS)
+
+
+def purge_pending_posts() -> None:
+    """Run every purge that has not completed and is not leased elsewhere."""
+    owner = worker_id()
+    with SessionLocal() as db:
+        pending: list[int] = list(
+            db.scalars(
+                select(models.PostPurge.post_id)
+                .filter(
+                    models.PostPurge.completed_at.is_(None),
+                    or_(
+                        models.PostPurge.claimed_until.is_(None),
+                        models.PostPurge.claimed_until < models.utcnow(),
+                    ),
+                )
+                .order_by(models.PostPurge.requested_at)
+            )
+        )
+
+        for post_id in pending:
+            try:
+                if claim(db, post_id, owner):
+                    purge_post(db, post_id, owner)
+            except Exception as error:
+                db.rollback()
+                print(f"Purge of post {post_id} failed: {error}")
+
+
+# Purges soft-deleted posts; woken up by each delete.
+worker = PollingWorker("post-purge", settings.PURGE_POLL_SECONDS, purge_pending_posts)
@@ -0,0 +1,117 @@
+"""ORM-free versions of the hot post reads.
+
+The queries are compiled once for the engine's dialect and run on a pooled
+DB-API connection; each row is turned straight into the dict the response
+model validates, without building `models.Post` objects. The authors are
+not joined in; the router fills them in from the author cache.
+"""
+
+from typing import Any, Optional
+
+from sqlalchemy import Integer, Select, String, bindparam, func, select
+
+from . import models
+from .database import engine
+
+POST_COLUMNS = (
+    "id",
+    "title",
+    "content",
+    "published",
+    "created_at",
+    "modified_at",
+    "user_id",
+)
+
+
+class Statement:
+    """A query compiled to the driver's SQL and parameter style."""
+
+    def __init__(self, stmt: Select) -> None:
+        compiled = stmt.compile(dialect=engine.dialect)
+        self.sql = str(compiled)
+        self.positions: Optional[tuple[str, ...]] = (
+            tuple(compiled.positiontup) if compiled.positional else None
+        )
+
+    def fetchall(self, **params: Any) -> list[tuple]:
+        values = (
+            tuple(params[name] for name in self.positions)
+            if self.positions is not None
+            else params
+        )
+        connection = engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(self.sql, values)
+            rows = cursor.fetchall()
+            cursor.close()
+        finally:
+            # Returns the connection to the pool, which rolls it back.
+            connection.close()
+        return rows
+
+
+def post_query() -> Select:
+    likes = (
+        select(func.count(models.Vote.post_id))
+        .filter(models.Vote.post_id == models.Post.id)
+        .scalar_subquery()
+    )
+    return select(
+        *(getattr(models.Post, column) for column in POST_COLUMNS),
+        likes,
+    ).filter(models.Post.deleted_at.is_(None))
+
+
+POSTS = Statement(
+    post_query()
+    .filter(models.Post.title.contains(bindparam("search", type_=String)))
+    .limit(bindparam("limit", type_=Integer))
+    .offset(bindparam("offset", type_=Integer))
+)
+USER_POSTS = Statement(
+    post_query().filter(models.Post.user_id == bindparam("user_id", type_=Integer))
+)
+POST = Statement(
+    post_query().filter(models.Post.id == bindparam("post_id", type_=Integer))
+)
+
+
+def to_post_out(row: tuple) -> dict[str, Any]:
+    (
+        id,
+        title,
+        content,
+        published,
+        created_at,
+        modified_at,
+        user_id,
+        likes,
+    ) = row
+    return {
+        "id": id,
+        "title": title,
+        "content": content,
+        "published": published,
+        "created_at": created_at,
+        "modified_at": modified_at,
+        "user_id": user_id,
+        "likes": likes,
+    }
+
+
+def read_posts(limit: int, offset: int, search: str) -> list[dict[str, Any]]:
+    return [
+        to_post_out(row)
+        for row in POSTS.fetchall(search=search, limit=limit, offset=offset)
+    ]
+
+
+def read_user_posts(user_id: int) -> list[dict[str, Any]]:
+    return [to_post_out(row) for row in USER_POSTS.fetchall(user_id=user_id)]
+
+
+def read_post(post_id: int) -> Optional[dict[str, Any]]:
+    rows = POST.fetchall(post_id=post_id)
+    return to_post_out(rows[0]) if rows else None
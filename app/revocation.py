@@ -0,0 +1,128 @@
+import calendar
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from . import models
+from .config import get_settings
+from .database import SessionLocal
+from .polling import PollingWorker
+
+settings = get_settings()
+
+
+def to_timestamp(value: datetime) -> int:
+    """Seconds since the epoch of a naive UTC datetime."""
+    return calendar.timegm(value.timetuple())
+
+
+def to_milliseconds(value: datetime) -> int:
+    """Milliseconds since the epoch of a naive UTC datetime."""
+    return to_timestamp(value) * 1000 + value.microsecond // 1000
+
+
+def apply(
+    revoked: models.RevokedToken, tokens: dict[str, int], users: dict[int, int]
+) -> None:
+    """Record a revocation; applying one twice changes nothing."""
+    if revoked.jti is not None:
+        tokens[revoked.jti] = to_timestamp(revoked.expires_at)
+    else:
+        revoked_before = to_milliseconds(revoked.revoked_at)
+        if revoked_before > users.get(revoked.user_id, 0):
+            users[revoked.user_id] = revoked_before
+
+
+class RevocationList:
+    """In-memory copy of the `revoked_tokens` table.
+
+    `is_revoked` runs on every authenticated request and only does dictionary
+    lookups. In the background, `sync` re-reads the revocations of the last
+    REVOCATION_SYNC_OVERLAP_SECONDS, so rows committed out of id order are
+    not missed, and the whole table is reloaded whenever it is pruned.
+    """
+
+    def __init__(self) -> None:
+        # jti -> expiry of the revoked token
+        self._tokens: dict[str, int] = {}
+        # user id -> tokens issued before this time (epoch ms) are revoked
+        self._users: dict[int, int] = {}
+        self._synced_at: datetime | None = None
+        self._last_prune = time.monotonic()
+        self._lock = threading.Lock()
+
+    def is_revoked(
+        self, jti: Optional[str], user_id: int, issued_ms: Optional[int]
+    ) -> bool:
+        if jti is not None and jti in self._tokens:
+            return True
+
+        revoked_before = self._users.get(user_id)
+        if revoked_before is None:
+            return False
+
+        # Tokens without an issue time predate revocation support.
+        return issued_ms is None or issued_ms < revoked_before
+
+    def add(self, revoked: models.RevokedToken) -> None:
+        with self._lock:
+            self._add(revoked)
+
+    def _add(self, revoked: models.RevokedToken) -> None:
+        apply(revoked, self._tokens, self._users)
+
+    def sync(self, db: Session) -> None:
+        """Load the revocations of the last overlap window, or all of them."""
+        with self._lock:
+            if time.monotonic() - self._last_prune > settings.REVOCATION_PRUNE_SECONDS:
+                self._prune(db)
+                return
+
+            query = select(models.RevokedToken)
+            if self._synced_at is not None:
+                overlap = timedelta(seconds=settings.REVOCATION_SYNC_OVERLAP_SECONDS)
+                query = query.filter(
+                    models.RevokedToken.revoked_at >= self._synced_at - overlap
+                )
+
+            for revoked in db.scalars(query):
+                self._add(revoked)
+                if self._synced_at is None or revoked.revoked_at > self._synced_at:
+                    self._synced_at = revoked.revoked_at
+
+    def _prune(self, db: Session) -> None:
+        """Delete expired revocations and reload the rest from scratch."""
+        db.execute(
+            delete(models.RevokedToken).filter(
+                models.RevokedToken.expires_at < models.utcnow()
+            )
+        )
+        db.commit()
+
+        rows: list[models.RevokedToken] = list(db.scalars(select(models.RevokedToken)))
+        tokens: dict[str, int] = {}
+        users: dict[int, int] = {}
+        for revoked in rows:
+            apply(revoked, tokens, users)
+        # Swapped so concurrent readers never see a dict mid-rebuild.
+        self._tokens, self._users = tokens, users
+        self._synced_at = max((revoked.revoked_at for revoked in rows), default=None)
+        self._last_prune = time.monotonic()
+
+
+revocations = RevocationList()
+
+
+def sync_revocations() -> None:
+    with SessionLocal() as db:
+        revocations.sync(db)
+
+
+# Keeps `revocations` up to date.
+worker = PollingWorker(
+    "revocation-sync", settings.REVOCATION_SYNC_SECONDS, sync_revocations
+)
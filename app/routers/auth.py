@@ -1,3 +1,4 @@
+from datetime import datetime, timedelta, timezone
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, status
@@ -6,7 +7,11 @@ from sqlalchemy import or_
 from sqlalchemy.orm import Session
 
 from .. import models, oauth2, schemas, utils
+from ..config import get_settings
 from ..database import get_db
+from ..revocation import revocations
+
+settings = get_settings()
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
@@ -45,3 +50,72 @@ def login(
         "access_token": access_token,
         "token_type": "Bearer",
     }
+
+
+def current_token(
+    token: Annotated[str, Depends(oauth2.oauth2_scheme)],
+) -> schemas.TokenData:
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    return oauth2.verify_access_token(token, credentials_exception)
+
+
+def revoke(db: Session, revoked: models.RevokedToken) -> None:
+    """Store a revocation and apply it to this worker right away."""
+    try:
+        db.add(revoked)
+        db.commit()
+        db.refresh(revoked)
+
+    except Exception as error:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An error occurred while revoking the token.",
+        ) from error
+
+    # Other workers pick it up on their next revocation sync.
+    revocations.add(revoked)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(
+    token_data: Annotated[schemas.TokenData, Depends(current_token)],
+    db: Annotated[Session, Depends(get_db)],
+) -> None:
+    """Revoke the access token used for this request."""
+    if token_data.jti is None or token_data.exp is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="This token cannot be revoked individually",
+        )
+
+    expires_at = datetime.fromtimestamp(token_data.exp, timezone.utc)
+    revoke(
+        db,
+        models.RevokedToken(
+            jti=token_data.jti,
+            user_id=int(token_data.id),
+            expires_at=expires_at.replace(tzinfo=None),
+        ),
+    )
+
+
+@router.post("/logout/all", status_code=status.HTTP_204_NO_CONTENT)
+def logout_all(
+    token_data: Annotated[schemas.TokenData, Depends(current_token)],
+    db: Annotated[Session, Depends(get_db)],
+) -> None:
+    """Revoke every access token issued to the user so far."""
+    now = models.utcnow()
+    revoke(
+        db,
+        models.RevokedToken(
+            user_id=int(token_data.id),
+            revoked_at=now,
+            expires_at=now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+        ),
+    )
@@ -1,36 +1,146 @@
 from typing import Annotated, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import func, insert, select, text
 from sqlalchemy.engine.row import Row
 from sqlalchemy.orm import Session
 
-from .. import models, oauth2, schemas
+from .. import models, oauth2, purge, raw_reads, schemas
+from ..author_cache import Author, authors
+from ..config import get_settings
 from ..database import get_db
+from ..singleflight import post_reads
+from ..stats import (
+    POSTS_COUNTER,
+    bump_counter,
+    bump_user_stats,
+    estimate_matching_posts,
+    read_post_total,
+)
+
+settings = get_settings()
 
 router = APIRouter(prefix="/posts", tags=["Posts"])
 
 DbSession = Annotated[Session, Depends(get_db)]
 CurrentUser = Annotated[int, Depends(oauth2.get_current_user)]
 
+MAX_BULK_POSTS = 10_000
+
+
+def post_out(
+    post: models.Post | models.PostArchive, likes: int, author: Author
+) -> schemas.PostOut:
+    return schemas.PostOut(
+        id=post.id,
+        title=post.title,
+        content=post.content,
+        published=post.published,
+        created_at=post.created_at,
+        modified_at=post.modified_at,
+        user_id=post.user_id,
+        user=author._asdict(),
+        likes=likes,
+    )
+
+
+def posts_out(
+    db: Session, rows: list[Row[Tuple[models.Post | models.PostArchive, int]]]
+) -> list[schemas.PostOut]:
+    """Build the responses of posts read without their authors."""
+    found = authors.get_many(db, (post.user_id for post, _ in rows))
+    return [
+        post_out(post, likes, found[post.user_id])
+        for post, likes in rows
+        # The author may have been deleted since the posts were read.
+        if post.user_id in found
+    ]
+
+
+def add_authors(db: Session, posts: list[dict]) -> list[dict]:
+    """Fill in the authors of posts read by `raw_reads`."""
+    found = authors.get_many(db, (post["user_id"] for post in posts))
+    for post in posts:
+        if post["user_id"] in found:
+            post["user"] = found[post["user_id"]]._asdict()
+    return [post for post in posts if "user" in post]
+
+
+def fetch_posts(
+    db: Session, limit: int, offset: int, search: str
+) -> list[schemas.PostOut] | list[dict]:
+    if settings.READ_ENGINE == "raw":
+        return add_authors(db, raw_reads.read_posts(limit, offset, search))
+
+    rows: list[Row[Tuple[models.Post, int]]] = (
+        db.query(models.Post, func.count(models.Vote.post_id).label("likes"))
+        .join(models.Vote, models.Vote.post_id == models.Post.id, isouter=True)
+        .group_by(models.Post.id)
+        .filter(models.Post.deleted_at.is_(None))
+        .filter(models.Post.title.contains(search))
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
+    return posts_out(db, rows)
+
+
+def fetch_post(db: Session, post_id: int) -> schemas.PostOut | dict | None:
+    if settings.READ_ENGINE == "raw":
+        post = raw_reads.read_post(post_id)
+        posts = add_authors(db, [post]) if post else []
+    else:
+        row: Row[Tuple[models.Post, int]] | None = (
+            db.query(models.Post, func.count(models.Vote.post_id).label("likes"))
+            .join(models.Vote, models.Vote.post_id == models.Post.id, isouter=True)
+            .group_by(models.Post.id)
+            .filter(models.Post.id == post_id, models.Post.deleted_at.is_(None))
+            .first()
+        )
+        posts = posts_out(db, [row]) if row else []
+
+    return posts[0] if posts else fetch_archived_post(db, post_id)
+
+
+def fetch_archived_post(db: Session, post_id: int) -> schemas.PostOut | None:
+    """Look a post up in the archive, where the archive job moves cold posts."""
+    row: Row[Tuple[models.PostArchive, int]] | None = (
+        db.query(
+            models.PostArchive, func.count(models.VoteArchive.post_id).label("likes")
+        )
+        .join(
+            models.VoteArchive,
+            models.VoteArchive.post_id == models.PostArchive.id,
+            isouter=True,
+        )
+        .group_by(models.PostArchive.id)
+        .filter(models.PostArchive.id == post_id)
+        .first()
+    )
+    posts = posts_out(db, [row]) if row else []
+    return posts[0] if posts else None
+
+
+def set_total_count(response: Response, total: int, exact: bool) -> None:
+    response.headers["X-Total-Count"] = str(total)
+    response.headers["X-Total-Count-Exact"] = "true" if exact else "false"
+
 
 @router.get("/", response_model=list[schemas.PostOut])
 def read_posts(
     db: DbSession,
     user_id: CurrentUser,
+    response: Response,
     limit: int = 10,
     offset: int = 0,
     search: Optional[str] = "",
+    include_total: bool = False,
 ) -> list[schemas.PostOut]:
     """Get all posts."""
-    posts: list[Row[Tuple[models.Post, int]]] = (
-        db.query(models.Post, func.count(models.Vote.post_id).label("likes"))
-        .join(models.Vote, models.Vote.post_id == models.Post.id, isouter=True)
-        .group_by(models.Post.id)
-        .filter(models.Post.title.contains(search))
-        .offset(offset)
-        .limit(limit)
-        .all()
+    search = search or ""
+    posts = post_reads.do(
+        ("posts", limit, offset, search),
+        lambda: fetch_posts(db, limit, offset, search),
     )
 
     if not posts:
@@ -39,25 +149,40 @@ def read_posts(
             detail="No posts found",
         )
 
-    return [
-        schemas.PostOut(
-            **schemas.Post.model_validate(post, from_attributes=True).model_dump(),
-            likes=likes,
-        )
-        for post, likes in posts
-    ]
+    if include_total:
+        if len(posts) < limit:
+            # A short page is the last one, so the total is known exactly.
+            set_total_count(response, offset + len(posts), True)
+        elif not search:
+            set_total_count(response, read_post_total(db), True)
+        else:
+            total, exact = estimate_matching_posts(db, search, read_post_total(db))
+            if not exact:
+                # Matches older than the sample are not counted, but a full
+                # page shows there are at least this many.
+                total = max(total, offset + len(posts) + 1)
+            set_total_count(response, total, exact)
+
+    return posts
 
 
 @router.get("/myposts", response_model=list[schemas.PostOut])
-def read_user_posts(db: DbSession, user_id: CurrentUser) -> list[schemas.PostOut]:
+def read_user_posts(
+    db: DbSession, user_id: CurrentUser, response: Response, include_total: bool = False
+) -> list[schemas.PostOut]:
     """Get all posts."""
-    posts: list[Row[Tuple[models.Post, int]]] = (
-        db.query(models.Post, func.count(models.Vote.post_id).label("likes"))
-        .join(models.Vote, models.Vote.post_id == models.Post.id, isouter=True)
-        .group_by(models.Post.id)
-        .filter(models.Post.user_id == user_id)
-        .all()
-    )
+    if settings.READ_ENGINE == "raw":
+        posts = add_authors(db, raw_reads.read_user_posts(user_id))
+    else:
+        rows: list[Row[Tuple[models.Post, int]]] = (
+            db.query(models.Post, func.count(models.Vote.post_id).label("likes"))
+            .join(models.Vote, models.Vote.post_id == models.Post.id, isouter=True)
+            .group_by(models.Post.id)
+            .filter(models.Post.deleted_at.is_(None))
+            .filter(models.Post.user_id == user_id)
+            .all()
+        )
+        posts = posts_out(db, rows)
 
     if not posts:
         raise HTTPException(
@@ -65,13 +190,11 @@ def read_user_posts(db: DbSession, user_id: CurrentUser) -> list[schemas.PostOut
             detail="No posts found",
         )
 
-    return [
-        schemas.PostOut(
-            **schemas.Post.model_validate(post, from_attributes=True).model_dump(),
-            likes=likes,
-        )
-        for post, likes in posts
-    ]
+    if include_total:
+        # This listing is not paginated, so the total is the number of rows.
+        set_total_count(response, len(posts), True)
+
+    return posts
 
 
 @router.get("/{post_id}", response_model=schemas.PostOut)
@@ -79,13 +202,9 @@ def read_post_by_id(
     post_id: int, db: DbSession, user_id: CurrentUser
 ) -> schemas.PostOut:
     """Get a post by its ID."""
-    post: Row[Tuple[models.Post, int]] | None = (
-        db.query(models.Post, func.count(models.Vote.post_id).label("likes"))
-        .join(models.Vote, models.Vote.post_id == models.Post.id, isouter=True)
-        .group_by(models.Post.id)
-        .filter(models.Post.id == post_id)
-        .first()
-    )
+    # The query is the same for every user; visibility is checked below, per
+    # request, so concurrent readers can share it.
+    post = post_reads.do(("post", post_id), lambda: fetch_post(db, post_id))
 
     if not post:
         raise HTTPException(
@@ -93,25 +212,19 @@ def read_post_by_id(
             detail=f"Post with ID {post_id} was not found",
         )
 
-    post_obj: models.Post = post[0]
-    likes: int = post[1]
-
-    if post_obj.published:
-        return schemas.PostOut(
-            **schemas.Post.model_validate(post_obj, from_attributes=True).model_dump(),
-            likes=likes,
-        )
+    published, owner_id = (
+        (post["published"], post["user_id"])
+        if isinstance(post, dict)
+        else (post.published, post.user_id)
+    )
 
-    if not post_obj.published and post_obj.user_id != user_id:
+    if not published and owner_id != user_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You are not authorized to view this post",
         )
 
-    return schemas.PostOut(
-        **schemas.Post.model_validate(post_obj, from_attributes=True).model_dump(),
-        likes=likes,
-    )
+    return post
 
 
 @router.post("/", response_model=schemas.Post, status_code=status.HTTP_201_CREATED)
@@ -122,10 +235,20 @@ def create_post(
 ) -> schemas.Post:
     """Create a new post."""
     try:
-        new_post = models.Post(**post.model_dump(), user_id=user_id)
+        # One timestamp for both, so a new post does not look edited.
+        now = models.utcnow()
+        new_post = models.Post(
+            **post.model_dump(), user_id=user_id, created_at=now, modified_at=now
+        )
         db.add(new_post)
+        db.flush()
+        bump_user_stats(db, user_id, posts=1)
+        bump_counter(db, POSTS_COUNTER, 1)
+
+        # Timestamps are assigned on the app side, so the response can be built
+        # from the flushed object instead of refreshing it after the commit.
+        created_post = schemas.Post.model_validate(new_post, from_attributes=True)
         db.commit()
-        db.refresh(new_post)
 
     except Exception as error:
         db.rollback()
@@ -134,7 +257,104 @@ def create_post(
             detail="An error occurred while creating the post.",
         ) from error
 
-    return schemas.Post.model_validate(new_post, from_attributes=True)
+    return created_post
+
+
+@router.post(
+    "/bulk", response_model=list[schemas.Post], status_code=status.HTTP_201_CREATED
+)
+def create_posts_bulk(
+    posts: list[schemas.InputPost],
+    db: DbSession,
+    user_id: CurrentUser,
+) -> list[schemas.Post]:
+    """Create many posts in a single statement."""
+    if not posts:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No posts were provided",
+        )
+
+    if len(posts) > MAX_BULK_POSTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_BULK_POSTS} posts can be created at once",
+        )
+
+    dialect = db.get_bind().dialect
+    now = models.utcnow()
+    if dialect.name == "mysql":
+        # DATETIME columns keep whole seconds, and the MySQL path below looks
+        # the new rows up by their stored `created_at`.
+        now = now.replace(microsecond=0)
+    rows = [
+        {**post.model_dump(), "user_id": user_id, "created_at": now, "modified_at": now}
+        for post in posts
+    ]
+
+    try:
+        if dialect.insert_executemany_returning:
+            # One batched INSERT ... RETURNING hands back the new rows directly.
+            new_posts = list(
+                db.scalars(insert(models.Post).returning(models.Post), rows)
+            )
+            created_posts = [
+                schemas.Post.model_validate(new_post, from_attributes=True)
+                for new_post in new_posts
+            ]
+        elif dialect.name == "mysql":
+            # One multi-row INSERT; the cursor reports the first generated id.
+            result = db.execute(insert(models.Post).values(rows))
+            first_id = result.lastrowid
+            if db.scalar(text("SELECT @@innodb_autoinc_lock_mode")) == 2:
+                # In interleaved mode (the MySQL 8 default) one statement's ids
+                # need not be consecutive, so read them back in this transaction.
+                post_ids = list(
+                    db.scalars(
+                        select(models.Post.id)
+                        .filter(
+                            models.Post.id >= first_id,
+                            models.Post.user_id == user_id,
+                            models.Post.created_at == now,
+                        )
+                        .order_by(models.Post.id)
+                        .limit(len(rows))
+                    )
+                )
+            else:
+                # Otherwise the rows of an insert whose row count is known up
+                # front get consecutive ids, one auto-increment step apart.
+                step = db.scalar(text("SELECT @@auto_increment_increment"))
+                post_ids = [first_id + index * step for index in range(len(rows))]
+
+            user = schemas.UserOut.model_validate(db.get(models.User, user_id))
+            created_posts = [
+                schemas.Post(**row, id=post_id, user=user)
+                for post_id, row in zip(post_ids, rows, strict=True)
+            ]
+        else:
+            # Elsewhere the ORM flush takes the ids from the cursor, and the
+            # app-side timestamps mean nothing has to be read back afterwards.
+            new_posts = [models.Post(**row) for row in rows]
+            db.add_all(new_posts)
+            db.flush()
+            created_posts = [
+                schemas.Post.model_validate(new_post, from_attributes=True)
+                for new_post in new_posts
+            ]
+
+        bump_user_stats(db, user_id, posts=len(created_posts))
+        bump_counter(db, POSTS_COUNTER, len(created_posts))
+        db.commit()
+
+    except Exception as error:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An error occurred while creating the posts.",
+        ) from error
+
+    return created_posts
 
 
 @router.put("/{post_id}", response_model=schemas.Post)
@@ -144,7 +364,9 @@ def update_post(
     """Update a post by its ID."""
     try:
         db_post: models.Post | None = (
-            db.query(models.Post).filter(models.Post.id == post_id).first()
+            db.query(models.Post)
+            .filter(models.Post.id == post_id, models.Post.deleted_at.is_(None))
+            .first()
         )
 
         if db_post is None:
@@ -186,7 +408,9 @@ def delete_post_by_id(post_id: int, db: DbSession, user_id: CurrentUser) -> None
     """Delete a post by its id."""
     try:
         db_post: models.Post | None = (
-            db.query(models.Post).filter(models.Post.id == post_id).first()
+            db.query(models.Post)
+            .filter(models.Post.id == post_id, models.Post.deleted_at.is_(None))
+            .first()
         )
 
         if db_post is None:
@@ -201,7 +425,17 @@ def delete_post_by_id(post_id: int, db: DbSession, user_id: CurrentUser) -> None
                 detail="You are not authorized to delete this post.",
             )
 
-        db.delete(db_post)
+        # Only flag the post here; its votes are removed in chunks by the purge
+        # worker so a heavily voted post does not hold locks for long.
+        db_post.deleted_at = models.utcnow()
+        likes: int = (
+            db.query(func.count(models.Vote.post_id))
+            .filter(models.Vote.post_id == post_id)
+            .scalar()
+        )
+        bump_user_stats(db, user_id, posts=-1, likes=-likes)
+        bump_counter(db, POSTS_COUNTER, -1)
+        db.add(models.PostPurge(post_id=db_post.id, user_id=user_id))
         db.commit()
 
     except HTTPException:
@@ -215,4 +449,36 @@ def delete_post_by_id(post_id: int, db: DbSession, user_id: CurrentUser) -> None
             detail="An error occurred while deleting the post.",
         ) from error
 
+    purge.worker.wake()
+
     return None
+
+
+@router.get("/{post_id}/purge", response_model=schemas.PostPurge)
+def read_post_purge(
+    post_id: int, db: DbSession, user_id: CurrentUser
+) -> schemas.PostPurge:
+    """Get the progress of removing a deleted post and its votes."""
+    post_purge: models.PostPurge | None = (
+        db.query(models.PostPurge).filter(models.PostPurge.post_id == post_id).first()
+    )
+
+    if post_purge is None or post_purge.user_id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No deletion of post with ID {post_id} was found",
+        )
+
+    votes_remaining: int = (
+        db.query(func.count(models.Vote.post_id))
+        .filter(models.Vote.post_id == post_id)
+        .scalar()
+    )
+
+    return schemas.PostPurge(
+        post_id=post_purge.post_id,
+        votes_deleted=post_purge.votes_deleted,
+        votes_remaining=votes_remaining,
+        requested_at=post_purge.requested_at,
+        completed_at=post_purge.completed_at,
+    )
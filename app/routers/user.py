@@ -1,11 +1,12 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import or_
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import or_, select
 from sqlalchemy.orm import Session
 
-from .. import models, schemas, utils
+from .. import models, schemas, stats, utils
 from ..database import get_db
+from ..username_index import usernames
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -24,6 +25,27 @@ def read_users(db: Session = Depends(get_db)) -> List[schemas.UserOut]:
     return [schemas.UserOut.model_validate(user) for user in users]
 
 
+@router.get("/search", response_model=List[str])
+def search_usernames(
+    prefix: str = Query(min_length=1, max_length=255),
+    limit: int = Query(default=10, ge=1, le=50),
+    db: Session = Depends(get_db),
+) -> List[str]:
+    """Get usernames starting with a prefix, for mention autocomplete."""
+    if usernames.ready:
+        return usernames.search(prefix, limit)
+
+    # The index is still being built, or is too large to keep in memory.
+    return list(
+        db.scalars(
+            select(models.User.username)
+            .filter(models.User.username.startswith(prefix, autoescape=True))
+            .order_by(models.User.username)
+            .limit(limit)
+        )
+    )
+
+
 @router.get("/{user_id}", response_model=schemas.UserOut)
 def read_user_by_id(user_id: int, db: Session = Depends(get_db)) -> schemas.UserOut:
     """Get a user by its ID."""
@@ -40,6 +62,20 @@ def read_user_by_id(user_id: int, db: Session = Depends(get_db)) -> schemas.User
     return schemas.UserOut.model_validate(user)
 
 
+@router.get("/{user_id}/stats", response_model=schemas.UserStats)
+def read_user_stats(user_id: int, db: Session = Depends(get_db)) -> schemas.UserStats:
+    """Get the post count and likes received of a user."""
+    user: models.User | None = db.get(models.User, user_id)
+
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"User with ID {user_id} was not found",
+        )
+
+    return schemas.UserStats.model_validate(stats.read_user_stats(db, user_id))
+
+
 # check username and email are unique
 def unique_user(username: str, email: str, db: Session) -> bool:
 
@@ -77,8 +113,11 @@ def create_user(
         user.password = hashed_password
         new_user = models.User(**user.model_dump())
         db.add(new_user)
+        db.flush()
+        db.add(models.UserStats(user_id=new_user.id))
         db.commit()
         db.refresh(new_user)
+        usernames.add(new_user.username)
 
     except HTTPException:
         raise
@@ -1,22 +1,115 @@
-from typing import Annotated
+import asyncio
+import json
+from typing import Annotated, AsyncIterator
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, or_
 from sqlalchemy.orm import Session
 
 from .. import models, oauth2, schemas
+from ..broker import broker
+from ..config import get_settings
 from ..database import get_db
+from ..stats import bump_user_stats
+
+settings = get_settings()
 
 router = APIRouter(prefix="/votes", tags=["Votes"])
 
 DbSession = Annotated[Session, Depends(get_db)]
 CurrentUser = Annotated[int, Depends(oauth2.get_current_user)]
 
+HEARTBEAT_SECONDS = 15.0
+
+
+def publish_likes(post_id: int, delta: int) -> None:
+    """Push a change of a post's like count to its live subscribers.
+
+    Called after the vote is committed, so a failure here is only logged.
+    """
+    try:
+        broker.publish(post_id, delta)
+    except Exception as error:
+        print(f"Publishing likes of post {post_id} failed: {error}")
+
+
+def visible_likes(
+    db: Session, user_id: int, post_ids: list[int]
+) -> list[tuple[int, int]]:
+    """Like counts of the given posts that the user is allowed to see."""
+    counts: list[tuple[int, int]] = (
+        db.query(models.Post.id, func.count(models.Vote.post_id))
+        .join(models.Vote, models.Vote.post_id == models.Post.id, isouter=True)
+        .group_by(models.Post.id)
+        .filter(
+            models.Post.id.in_(post_ids),
+            models.Post.deleted_at.is_(None),
+            or_(models.Post.published, models.Post.user_id == user_id),
+        )
+        .all()
+    )
+    # Release the connection; the stream itself never touches the database.
+    db.close()
+    return counts
+
+
+def likes_event(post_id: int, likes: int) -> str:
+    data = json.dumps({"post_id": post_id, "likes": likes})
+    return f"event: likes\ndata: {data}\n\n"
+
+
+@router.get("/stream")
+async def stream_likes(
+    request: Request,
+    db: DbSession,
+    user_id: CurrentUser,
+    post_id: Annotated[list[int], Query()],
+) -> StreamingResponse:
+    """Stream like counts of the given posts as server-sent events."""
+    max_posts = settings.LIKES_MAX_POSTS_PER_STREAM
+    if len(post_id) > max_posts:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {max_posts} posts can be followed at once",
+        )
+
+    counts = await run_in_threadpool(visible_likes, db, user_id, post_id)
+    subscription = broker.subscribe(counts)
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            for visible_id, likes in subscription.likes.items():
+                yield likes_event(visible_id, likes)
+
+            while not subscription.closed:
+                try:
+                    batch = await asyncio.wait_for(
+                        subscription.queue.get(), HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": heartbeat\n\n"
+                    continue
+
+                for changed_id, likes in batch.items():
+                    yield likes_event(changed_id, likes)
+        finally:
+            broker.unsubscribe(subscription)
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
-async def create_vote(vote: schemas.Vote, db: DbSession, user_id: CurrentUser):
+def create_vote(vote: schemas.Vote, db: DbSession, user_id: CurrentUser):
+    # A plain `def`, so FastAPI runs the blocking queries in its threadpool.
     try:
         post: models.Post | None = (
-            db.query(models.Post).filter(models.Post.id == vote.post_id).first()
+            db.query(models.Post)
+            .filter(models.Post.id == vote.post_id, models.Post.deleted_at.is_(None))
+            .first()
         )
         if not post:
             raise HTTPException(
@@ -42,6 +135,27 @@ async def create_vote(vote: schemas.Vote, db: DbSession, user_id: CurrentUser):
 
             new_vote = models.Vote(post_id=vote.post_id, user_id=user_id)
             db.add(new_vote)
+            db.flush()
+
+            # A partitioned `posts` has no foreign keys, so make sure the post
+            # has not been archived or deleted since it was read; the shared
+            # lock keeps either from happening until this vote is committed.
+            if (
+                db.query(models.Post.id)
+                .filter(
+                    models.Post.id == vote.post_id, models.Post.deleted_at.is_(None)
+                )
+                .with_for_update(read=True)
+                .first()
+                is None
+            ):
+                db.rollback()
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Post with id {vote.post_id} was not found",
+                )
+
+            bump_user_stats(db, post.user_id, likes=1)
             db.commit()
             db.refresh(new_vote)
         else:
@@ -52,13 +166,9 @@ async def create_vote(vote: schemas.Vote, db: DbSession, user_id: CurrentUser):
                 )
 
             db.delete(existing_vote)
+            bump_user_stats(db, post.user_id, likes=-1)
             db.commit()
 
-            raise HTTPException(
-                status_code=status.HTTP_204_NO_CONTENT,
-                detail=f"Vote with post id {vote.post_id} and user id {user_id} was deleted.",
-            )
-
     except HTTPException:
         raise
 
@@ -68,3 +178,11 @@ async def create_vote(vote: schemas.Vote, db: DbSession, user_id: CurrentUser):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An error occurred while creating the vote.",
         ) from error
+
+    publish_likes(vote.post_id, 1 if vote.vote_dir else -1)
+
+    if not vote.vote_dir:
+        raise HTTPException(
+            status_code=status.HTTP_204_NO_CONTENT,
+            detail=f"Vote with post id {vote.post_id} and user id {user_id} was deleted.",
+        )
@@ -26,6 +26,14 @@ class UserOut(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class UserStats(BaseModel):
+    user_id: int
+    post_count: int
+    likes_received: int
+
+    model_config = {"from_attributes": True}
+
+
 class UserLogin(BaseModel):
     email: EmailStr
     password: str
@@ -38,6 +46,9 @@ class Token(BaseModel):
 
 class TokenData(BaseModel):
     id: str
+    jti: Optional[str] = None
+    iat: Optional[int] = None
+    exp: Optional[int] = None
 
 
 class InputPost(BaseModel):
@@ -63,3 +74,13 @@ class PostOut(Post):
 class Vote(BaseModel):
     post_id: int
     vote_dir: bool
+
+
+class PostPurge(BaseModel):
+    post_id: int
+    votes_deleted: int
+    votes_remaining: int
+    requested_at: datetime
+    completed_at: Optional[datetime]
+
+    model_config = {"from_attributes": True}
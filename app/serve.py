@@ -0,0 +1,255 @@
+"""Pre-forking production server.
+
+    python -m app.serve --host 0.0.0.0 --port 8000
+
+The master process imports the app once and then forks the workers, so the
+imported modules, compiled schemas and prepared statements are shared
+copy-on-write. Workers start one after another, so their database
+connections are not all opened at the same moment.
+
+Signals sent to the master:
+    SIGHUP           replace the workers one by one, draining each old one
+    SIGTERM, SIGINT  drain all workers and exit
+
+SIGHUP only restarts workers. With preloading they are forked from the
+master and so keep running the code it imported; deploying new code needs
+a restart of the master, or `--no-preload`, where each new worker imports
+the app itself.
+
+A worker that dies within MIN_UPTIME_SECONDS of starting is restarted with
+an exponential backoff, and the master gives up and exits after
+MAX_QUICK_FAILURES such failures in a row.
+"""
+
+import argparse
+import contextlib
+import gc
+import importlib
+import os
+import signal
+import socket
+import sys
+import time
+import traceback
+
+import uvicorn
+
+from .config import get_settings
+
+settings = get_settings()
+
+MIN_UPTIME_SECONDS = 5.0
+MAX_QUICK_FAILURES = 5
+BACKOFF_SECONDS = 0.5
+MAX_BACKOFF_SECONDS = 30.0
+
+# uvicorn's exit status when the app fails to start.
+STARTUP_FAILURE = 3
+
+
+def default_workers() -> int:
+    """One worker per core, as long as every worker can get a full DB pool."""
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cores = os.cpu_count() or 1
+
+    per_worker = settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+    return max(1, min(cores, settings.DB_MAX_CONNECTIONS // per_worker))
+
+
+def run_worker(sock: socket.socket, args: argparse.Namespace, delay: float) -> int:
+    """Serve until told to stop; returns the worker's exit status."""
+    for signum in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, signal.SIG_DFL)
+
+    time.sleep(delay)
+
+    from .database import engine
+    from .main import app
+
+    # Connections must never be shared with the parent or other workers.
+    engine.dispose(close=False)
+    with engine.connect():
+        pass
+
+    config = uvicorn.Config(
+        app,
+        log_level=args.log_level,
+        timeout_graceful_shutdown=args.graceful_timeout,
+    )
+    server = uvicorn.Server(config)
+    server.run(sockets=[sock])
+    return 0 if server.started else STARTUP_FAILURE
+
+
+class Master:
+    def __init__(self, sock: socket.socket, args: argparse.Namespace) -> None:
+        self.sock = sock
+        self.args = args
+        self.workers: dict[int, int] = {}  # pid -> worker slot
+        self.started: dict[int, float] = {}  # pid -> when it began serving
+        self.retiring: set[int] = set()
+        self.failures: dict[int, int] = {}  # slot -> quick failures in a row
+        self.respawn_at: dict[int, float] = {}  # slot -> when to start it again
+        self.stopping = False
+        self.reloading = False
+        self.failed = False
+
+    def spawn(self, slot: int, delay: float = 0.0) -> None:
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                status = run_worker(self.sock, self.args, delay)
+            except SystemExit as exit:
+                status = exit.code if isinstance(exit.code, int) else 1
+            except BaseException:
+                traceback.print_exc()
+            finally:
+                # os._exit skips the interpreter's own flushing.
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(status)
+        self.workers[pid] = slot
+        self.started[pid] = time.monotonic() + delay
+
+    def reap(self) -> None:
+        while self.workers:
+            pid, wait_status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                return
+            slot = self.workers.pop(pid, None)
+            started = self.started.pop(pid, time.monotonic())
+            if pid in self.retiring:
+                self.retiring.discard(pid)
+            elif slot is not None and not self.stopping:
+                self.restart(slot, pid, wait_status, time.monotonic() - started)
+
+    def restart(self, slot: int, pid: int, wait_status: int, uptime: float) -> None:
+        """Schedule a new worker in place of one that exited unexpectedly."""
+        code = os.waitstatus_to_exitcode(wait_status)
+        if uptime >= MIN_UPTIME_SECONDS:
+            self.failures[slot] = 0
+            print(f"Worker {pid} exited with status {code}, starting a new one")
+            self.respawn_at[slot] = time.monotonic()
+            return
+
+        failures = self.failures[slot] = self.failures.get(slot, 0) + 1
+        if failures >= MAX_QUICK_FAILURES:
+            print(
+                f"Worker {pid} exited with status {code} {failures} times in a row"
+                " right after starting, giving up"
+            )
+            self.failed = self.stopping = True
+            return
+
+        delay = min(BACKOFF_SECONDS * 2 ** (failures - 1), MAX_BACKOFF_SECONDS)
+        print(
+            f"Worker {pid} exited with status {code} after {uptime:.1f}s,"
+            f" starting a new one in {delay:.1f}s"
+        )
+        self.respawn_at[slot] = time.monotonic() + delay
+
+    def respawn(self) -> None:
+        now = time.monotonic()
+        for slot, at in list(self.respawn_at.items()):
+            if at <= now:
+                del self.respawn_at[slot]
+                self.spawn(slot)
+
+    def reload(self) -> None:
+        """Start a fresh worker next to each old one, then drain the old one.
+
+        The new workers are forked from this process, so they only run new
+        code when preloading is off.
+        """
+        self.reloading = False
+        for pid, slot in list(self.workers.items()):
+            self.spawn(slot)
+            time.sleep(self.args.warmup_stagger)
+            self.retiring.add(pid)
+            with contextlib.suppress(ProcessLookupError):
+                os.kill(pid, signal.SIGTERM)
+
+    def signal_workers(self, signum: int) -> None:
+        for pid in self.workers:
+            with contextlib.suppress(ProcessLookupError):
+                os.kill(pid, signum)
+
+    def stop(self) -> None:
+        self.signal_workers(signal.SIGTERM)
+
+        deadline = time.monotonic() + self.args.graceful_timeout + 5
+        while self.workers and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.1)
+
+        self.signal_workers(signal.SIGKILL)
+
+    def run(self) -> None:
+        signal.signal(signal.SIGHUP, lambda *_: setattr(self, "reloading", True))
+        signal.signal(signal.SIGTERM, lambda *_: setattr(self, "stopping", True))
+        signal.signal(signal.SIGINT, lambda *_: setattr(self, "stopping", True))
+
+        for slot in range(self.args.workers):
+            self.spawn(slot, delay=slot * self.args.warmup_stagger)
+        print(f"Started {self.args.workers} workers (master pid {os.getpid()})")
+
+        while not self.stopping:
+            if self.reloading:
+                self.reload()
+            self.reap()
+            self.respawn()
+            time.sleep(0.2)
+
+        self.stop()
+        if self.failed:
+            sys.exit(1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve the API with forked workers.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument("--backlog", type=int, default=2048)
+    parser.add_argument(
+        "--no-preload",
+        action="store_true",
+        help="import the app in each worker instead of once before forking",
+    )
+    parser.add_argument(
+        "--warmup-stagger",
+        type=float,
+        default=0.5,
+        help="seconds between starting consecutive workers",
+    )
+    parser.add_argument(
+        "--graceful-timeout",
+        type=int,
+        default=30,
+        help="seconds a worker may spend finishing requests when stopped",
+    )
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.listen(args.backlog)
+    sock.set_inheritable(True)
+
+    if not args.no_preload:
+        importlib.import_module(f"{__package__}.main")
+
+        # Keep the garbage collector from touching, and so copying, the
+        # preloaded objects in every worker.
+        gc.collect()
+        gc.freeze()
+
+    Master(sock, args).run()
+
+
+if __name__ == "__main__":
+    main()
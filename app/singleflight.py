@@ -0,0 +1,67 @@
+import threading
+from typing import Any, Callable, Hashable
+
+
+class Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Lets concurrent identical calls share one execution and its result.
+
+    The first caller for a key runs the function; callers arriving with the
+    same key while it runs wait for it and get the same result or exception.
+    Nothing is cached once the call has finished.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, Call] = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = Call()
+                leader = True
+                self.executions += 1
+            else:
+                leader = False
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result
+
+    def stats(self) -> dict[str, float]:
+        requests = self.executions + self.shared
+        return {
+            "requests": requests,
+            "executions": self.executions,
+            "shared": self.shared,
+            "coalescing_ratio": self.shared / requests if requests else 0.0,
+        }
+
+
+post_reads = SingleFlight()
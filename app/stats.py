@@ -0,0 +1,209 @@
+import argparse
+
+from sqlalchemy import case, func, select, true, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import models
+from .config import get_settings
+from .database import SessionLocal
+
+settings = get_settings()
+
+POSTS_COUNTER = "posts"
+
+
+def bump_user_stats(db: Session, user_id: int, posts: int = 0, likes: int = 0) -> None:
+    """Adjust a user's counters inside the caller's transaction.
+
+    Users without a counters row are left alone; the row is built from the
+    real counts the first time it is read or reconciled.
+    """
+    db.execute(
+        update(models.UserStats)
+        .filter(models.UserStats.user_id == user_id)
+        .values(
+            post_count=models.UserStats.post_count + posts,
+            likes_received=models.UserStats.likes_received + likes,
+        )
+    )
+
+
+def count_user_stats(db: Session, user_ids: list[int]) -> dict[int, tuple[int, int]]:
+    """Count posts and likes received from the live and archived posts."""
+    counts = {user_id: [0, 0] for user_id in user_ids}
+
+    for post_model, vote_model, live in (
+        (models.Post, models.Vote, models.Post.deleted_at.is_(None)),
+        (models.PostArchive, models.VoteArchive, true()),
+    ):
+        post_counts = db.execute(
+            select(post_model.user_id, func.count(post_model.id))
+            .filter(post_model.user_id.in_(user_ids), live)
+            .group_by(post_model.user_id)
+        )
+        like_counts = db.execute(
+            select(post_model.user_id, func.count(vote_model.post_id))
+            .join(vote_model, vote_model.post_id == post_model.id)
+            .filter(post_model.user_id.in_(user_ids), live)
+            .group_by(post_model.user_id)
+        )
+        for user_id, post_count in post_counts:
+            counts[user_id][0] += post_count
+        for user_id, likes in like_counts:
+            counts[user_id][1] += likes
+
+    return {user_id: (posts, likes) for user_id, (posts, likes) in counts.items()}
+
+
+def read_user_stats(db: Session, user_id: int) -> models.UserStats:
+    """Get a user's counters, creating them from the real counts if missing."""
+    stats: models.UserStats | None = db.get(models.UserStats, user_id)
+    if stats is not None:
+        return stats
+
+    post_count, likes = count_user_stats(db, [user_id])[user_id]
+    stats = models.UserStats(
+        user_id=user_id, post_count=post_count, likes_received=likes
+    )
+    try:
+        db.add(stats)
+        db.commit()
+    except IntegrityError:
+        # A concurrent first read created the row in the meantime.
+        db.rollback()
+        stats = db.get(models.UserStats, user_id)
+    return stats
+
+
+def bump_counter(db: Session, name: str, delta: int) -> None:
+    """Adjust a site-wide counter inside the caller's transaction."""
+    db.execute(
+        update(models.Counter)
+        .filter(models.Counter.name == name)
+        .values(value=models.Counter.value + delta)
+    )
+
+
+def count_posts(db: Session) -> int:
+    return db.scalar(
+        select(func.count(models.Post.id)).filter(models.Post.deleted_at.is_(None))
+    )
+
+
+def read_post_total(db: Session) -> int:
+    """Number of posts, from the counter kept by the post routes."""
+    counter: models.Counter | None = db.get(models.Counter, POSTS_COUNTER)
+    if counter is not None:
+        return counter.value
+
+    counter = models.Counter(name=POSTS_COUNTER, value=count_posts(db))
+    try:
+        db.add(counter)
+        db.commit()
+    except IntegrityError:
+        # A concurrent first read created the counter in the meantime.
+        db.rollback()
+        counter = db.get(models.Counter, POSTS_COUNTER)
+    return counter.value
+
+
+def estimate_matching_posts(db: Session, search: str, total: int) -> tuple[int, bool]:
+    """Estimate how many posts have `search` in their title.
+
+    The filter is applied to the most recent COUNT_SAMPLE_SIZE posts only and
+    scaled up to `total`; the result is exact when that covers every post.
+    """
+    sample = (
+        select(models.Post.title)
+        .filter(models.Post.deleted_at.is_(None))
+        .order_by(models.Post.id.desc())
+        .limit(settings.COUNT_SAMPLE_SIZE)
+        .subquery()
+    )
+    sampled, matching = db.execute(
+        select(
+            func.count(),
+            func.coalesce(
+                func.sum(case((sample.c.title.contains(search), 1), else_=0)), 0
+            ),
+        ).select_from(sample)
+    ).one()
+
+    if sampled < settings.COUNT_SAMPLE_SIZE:
+        return matching, True
+
+    return round(matching / sampled * total), False
+
+
+def reconcile_user_stats(db: Session, batch_size: int = 1000) -> int:
+    """Rewrite every user's counters from the real counts; returns the fixes made."""
+    fixed = 0
+    last_id = 0
+
+    while True:
+        user_ids: list[int] = list(
+            db.scalars(
+                select(models.User.id)
+                .filter(models.User.id > last_id)
+                .order_by(models.User.id)
+                .limit(batch_size)
+            )
+        )
+        if not user_ids:
+            return fixed
+
+        counts = count_user_stats(db, user_ids)
+        existing = {
+            stats.user_id: stats
+            for stats in db.scalars(
+                select(models.UserStats).filter(models.UserStats.user_id.in_(user_ids))
+            )
+        }
+
+        for user_id, (post_count, likes) in counts.items():
+            stats = existing.get(user_id)
+            if stats is None:
+                db.add(
+                    models.UserStats(
+                        user_id=user_id, post_count=post_count, likes_received=likes
+                    )
+                )
+                fixed += 1
+            elif (stats.post_count, stats.likes_received) != (post_count, likes):
+                stats.post_count = post_count
+                stats.likes_received = likes
+                fixed += 1
+
+        # One short transaction per batch keeps row locks brief.
+        db.commit()
+        last_id = user_ids[-1]
+
+
+def reconcile_post_total(db: Session) -> bool:
+    """Rewrite the post counter from the posts table; returns whether it drifted."""
+    total = count_posts(db)
+    counter: models.Counter | None = db.get(models.Counter, POSTS_COUNTER)
+
+    if counter is None:
+        db.add(models.Counter(name=POSTS_COUNTER, value=total))
+    elif counter.value != total:
+        counter.value = total
+    else:
+        return False
+
+    db.commit()
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Recompute the post and like counters."
+    )
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        print(f"Fixed counters of {reconcile_user_stats(db, args.batch_size)} users")
+        if reconcile_post_total(db):
+            print("Fixed the post total")
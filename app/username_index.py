@@ -0,0 +1,122 @@
+import bisect
+import threading
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from . import models
+from .config import get_settings
+from .database import SessionLocal
+from .polling import PollingWorker
+
+settings = get_settings()
+
+
+class UsernameIndex:
+    """Sorted in-memory list of usernames for case-insensitive prefix lookups.
+
+    `keys` holds the casefolded usernames in order and `names` the originals
+    at the same positions; for lowercase usernames both share one string.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self.keys: list[str] = []
+        self.names: list[str] = []
+        self.ready = False
+        self._last_id = 0
+        self._lock = threading.Lock()
+
+    def _insert(self, username: str) -> None:
+        key = username.casefold()
+        if key == username:
+            key = username
+        position = bisect.bisect_left(self.keys, key)
+
+        # A user added by `add` comes back in the next sync.
+        end = bisect.bisect_right(self.keys, key, position)
+        if username in self.names[position:end]:
+            return
+
+        self.keys.insert(position, key)
+        self.names.insert(position, username)
+
+    def add(self, username: str) -> None:
+        """Add a user created by this worker without waiting for the next sync."""
+        with self._lock:
+            if not self.ready:
+                return
+            if len(self.keys) >= self.max_size:
+                self.keys, self.names, self.ready = [], [], False
+                return
+            self._insert(username)
+
+    def sync(self, db: Session) -> None:
+        """Load users created since the previous sync; the first call builds it.
+
+        The last USERNAME_INDEX_SYNC_OVERLAP ids before the newest one seen are
+        read again, so users committed out of id order are not missed.
+        """
+        if self._last_id and not self.ready:
+            # It grew past max_size, so searches stay on the database.
+            return
+
+        since = max(0, self._last_id - settings.USERNAME_INDEX_SYNC_OVERLAP)
+        rows = db.execute(
+            select(models.User.id, models.User.username)
+            .filter(models.User.id > since)
+            .order_by(models.User.id)
+            .limit(self.max_size + 1)
+        ).all()
+
+        if not rows:
+            self.ready = True
+            return
+
+        if not self.ready:
+            # Sorting once is much cheaper than inserting row by row.
+            pairs = sorted((name.casefold(), name) for _, name in rows)
+            keys = [name if key == name else key for key, name in pairs]
+            names = [name for _, name in pairs]
+
+        with self._lock:
+            if not self.ready:
+                if len(rows) > self.max_size:
+                    self.keys, self.names = [], []
+                else:
+                    self.keys, self.names, self.ready = keys, names, True
+            else:
+                # Users already in the index are skipped by `_insert`.
+                for _, username in rows:
+                    self._insert(username)
+                if len(self.keys) > self.max_size:
+                    self.keys, self.names, self.ready = [], [], False
+            self._last_id = max(self._last_id, rows[-1].id)
+
+    def search(self, prefix: str, limit: int) -> list[str]:
+        key = prefix.casefold()
+        with self._lock:
+            start = bisect.bisect_left(self.keys, key)
+            end = min(start + limit, len(self.keys))
+            matches: list[str] = []
+
+            for position in range(start, end):
+                if not self.keys[position].startswith(key):
+                    break
+                matches.append(self.names[position])
+
+        return matches
+
+
+usernames = UsernameIndex(settings.USERNAME_INDEX_MAX_SIZE)
+
+
+def sync_usernames() -> None:
+    with SessionLocal() as db:
+        usernames.sync(db)
+
+
+# Builds `usernames` and keeps it up to date.
+worker = PollingWorker(
+    "username-index", settings.USERNAME_INDEX_SYNC_SECONDS, sync_usernames
+)
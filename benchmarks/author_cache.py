@@ -0,0 +1,143 @@
+"""Memory per cached author and feed latency with a cold and a warm cache.
+
+Feed pages are read through the router with the author cache cleared before
+every call (cold), and kept between calls (warm), for both read engines. As
+a baseline, the same page is read with the authors joined in by the ORM.
+
+    DATABASE_URL=sqlite:///bench.db python -m benchmarks.author_cache
+"""
+
+import os
+import random
+import time
+import tracemalloc
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///bench.db")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("ALGORITHM", "HS256")
+
+from fastapi import Response  # noqa: E402
+from sqlalchemy import func, insert, select  # noqa: E402
+from sqlalchemy.orm import Session, joinedload  # noqa: E402
+
+from app import models, schemas  # noqa: E402
+from app.author_cache import AuthorCache, authors  # noqa: E402
+from app.database import SessionLocal, engine  # noqa: E402
+from app.routers import post  # noqa: E402
+
+N_USERS = 50_000
+N_POSTS = 100_000
+PAGE_SIZE = 50
+CALLS = 300
+
+
+def setup() -> list[int]:
+    models.Base.metadata.create_all(bind=engine)
+    rng = random.Random(0)
+    tag = time.time_ns()
+    now = models.utcnow()
+    with SessionLocal() as db:
+        user_ids = list(
+            db.scalars(
+                insert(models.User).returning(models.User.id),
+                [
+                    {
+                        "username": f"a{tag}-{i}",
+                        "email": f"a{tag}-{i}@example.com",
+                        "password": "x",
+                    }
+                    for i in range(N_USERS)
+                ],
+            )
+        )
+        db.execute(
+            insert(models.Post),
+            [
+                {
+                    "title": f"post {i}",
+                    "content": "c",
+                    "user_id": rng.choice(user_ids),
+                    "created_at": now,
+                    "modified_at": now,
+                }
+                for i in range(N_POSTS)
+            ],
+        )
+        db.commit()
+    return user_ids
+
+
+def memory_per_author(user_ids: list[int]) -> float:
+    cache = AuthorCache(len(user_ids))
+    with SessionLocal() as db:
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        cache.get_many(db, user_ids)
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+    grown = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return grown / len(user_ids)
+
+
+def joined_page(db: Session, offset: int) -> list[schemas.PostOut]:
+    rows = db.execute(
+        select(models.Post, func.count(models.Vote.post_id))
+        .options(joinedload(models.Post.user))
+        .join(models.Vote, models.Vote.post_id == models.Post.id, isouter=True)
+        .group_by(models.Post.id)
+        .filter(models.Post.deleted_at.is_(None))
+        .offset(offset)
+        .limit(PAGE_SIZE)
+    ).all()
+    return [
+        schemas.PostOut(
+            **schemas.Post.model_validate(row, from_attributes=True).model_dump(),
+            likes=likes,
+        )
+        for row, likes in rows
+    ]
+
+
+def timed(read, clear: bool) -> float:
+    rng = random.Random(1)
+    offsets = [rng.randrange(0, N_POSTS // 2) for _ in range(CALLS)]
+    # Warm the pages and, unless cleared below, the author cache.
+    for offset in offsets:
+        with SessionLocal() as db:
+            read(db, offset)
+
+    elapsed = 0.0
+    for offset in offsets:
+        if clear:
+            authors.clear()
+        with SessionLocal() as db:
+            start = time.perf_counter()
+            read(db, offset)
+            elapsed += time.perf_counter() - start
+    return elapsed / CALLS
+
+
+def main() -> None:
+    user_ids = setup()
+    print(f"memory per cached author: {memory_per_author(user_ids):.0f} bytes")
+
+    def feed(db: Session, offset: int) -> list:
+        return post.read_posts(
+            db, user_ids[0], Response(), limit=PAGE_SIZE, offset=offset
+        )
+
+    print(f"{'joined (orm)':>12}: {timed(joined_page, False) * 1e3:6.2f} ms")
+    for read_engine in ("orm", "raw"):
+        post.settings.READ_ENGINE = read_engine
+        cold = timed(feed, True)
+        warm = timed(feed, False)
+        print(
+            f"{read_engine:>12}: cold {cold * 1e3:6.2f} ms  warm {warm * 1e3:6.2f} ms"
+            f"  ({PAGE_SIZE} posts per page)"
+        )
+    print(f"author cache: {authors.stats()}")
+
+
+if __name__ == "__main__":
+    main()
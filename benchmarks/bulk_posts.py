@@ -0,0 +1,77 @@
+"""Compare per-row post creation with the bulk insert path.
+
+Run from the repository root:
+
+    DATABASE_URL=sqlite:///bench.db python -m benchmarks.bulk_posts
+
+Any DATABASE_URL supported by the app works; the tables are created if needed.
+"""
+
+import os
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///bench.db")
+
+from sqlalchemy import insert  # noqa: E402
+
+from app import models  # noqa: E402
+from app.database import SessionLocal, engine  # noqa: E402
+
+N_POSTS = 5_000
+
+
+def setup_user() -> int:
+    models.Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        user = models.User(
+            username=f"bench-{time.time_ns()}",
+            email=f"bench-{time.time_ns()}@example.com",
+            password="x",
+        )
+        db.add(user)
+        db.commit()
+        return user.id
+
+
+def per_row_with_refresh(user_id: int) -> None:
+    """The previous create_post behaviour: commit and refresh every post."""
+    with SessionLocal() as db:
+        for i in range(N_POSTS):
+            post = models.Post(title=f"t{i}", content="c", user_id=user_id)
+            db.add(post)
+            db.commit()
+            db.refresh(post)
+
+
+def bulk(user_id: int) -> None:
+    now = models.utcnow()
+    rows = [
+        {
+            "title": f"t{i}",
+            "content": "c",
+            "user_id": user_id,
+            "created_at": now,
+            "modified_at": now,
+        }
+        for i in range(N_POSTS)
+    ]
+    with SessionLocal() as db:
+        if db.get_bind().dialect.insert_executemany_returning:
+            list(db.scalars(insert(models.Post).returning(models.Post), rows))
+        else:
+            db.add_all([models.Post(**row) for row in rows])
+            db.flush()
+        db.commit()
+
+
+def main() -> None:
+    user_id = setup_user()
+    for name, func in (("per-row + refresh", per_row_with_refresh), ("bulk", bulk)):
+        start = time.perf_counter()
+        func(user_id)
+        elapsed = time.perf_counter() - start
+        print(f"{name:>18}: {N_POSTS / elapsed:>10,.0f} posts/s ({elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
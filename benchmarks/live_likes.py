@@ -0,0 +1,81 @@
+"""Fan-out cost of the like-count broker with 10k concurrent subscribers.
+
+Each subscriber follows a handful of posts out of a shared pool and is
+consumed by its own task, like an SSE connection would be. Run with:
+
+    python -m benchmarks.live_likes
+"""
+
+import asyncio
+import random
+import time
+import tracemalloc
+
+from app.broker import Broker, LocalTransport
+
+N_SUBSCRIBERS = 10_000
+N_POSTS = 1_000
+POSTS_PER_SUBSCRIBER = 10
+UPDATES_PER_ROUND = 5_000
+ROUNDS = 20
+
+
+async def consume(subscription, received: list[int]) -> None:
+    while not subscription.closed:
+        batch = await subscription.queue.get()
+        received[0] += len(batch)
+
+
+async def main() -> None:
+    rng = random.Random(0)
+    broker = Broker(LocalTransport(), flush_interval=3600)
+    broker.start()
+
+    tracemalloc.start()
+    subscriptions = [
+        broker.subscribe(
+            (post_id, 0) for post_id in rng.sample(range(N_POSTS), POSTS_PER_SUBSCRIBER)
+        )
+        for _ in range(N_SUBSCRIBERS)
+    ]
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    received = [0]
+    consumers = [
+        asyncio.create_task(consume(subscription, received))
+        for subscription in subscriptions
+    ]
+
+    publish_time = flush_time = drain_time = 0.0
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        for _ in range(UPDATES_PER_ROUND):
+            broker.publish(rng.randrange(N_POSTS), rng.choice((1, -1)))
+        publish_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        broker.flush()
+        flush_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        await asyncio.sleep(0)
+        while any(not s.queue.empty() for s in subscriptions):
+            await asyncio.sleep(0)
+        drain_time += time.perf_counter() - start
+
+    for consumer in consumers:
+        consumer.cancel()
+    broker.stop()
+
+    published = UPDATES_PER_ROUND * ROUNDS
+    print(f"subscribers:            {N_SUBSCRIBERS:,}")
+    print(f"subscription memory:    {memory / N_SUBSCRIBERS:,.0f} B/subscriber")
+    print(f"publish:                {published / publish_time:,.0f} updates/s")
+    print(f"flush (coalesce+fan):   {flush_time / ROUNDS * 1000:.1f} ms/round")
+    print(f"consumer drain:         {drain_time / ROUNDS * 1000:.1f} ms/round")
+    print(f"updates delivered:      {received[0]:,} ({broker.dropped} dropped)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,107 @@
+"""CPU per request of the ORM and raw-SQL post reads, with a parity check.
+
+Both paths are run for the three hot reads, their responses are checked to
+be identical, and the CPU time per call is reported. Response validation
+and serialisation, which FastAPI does for either path, is included.
+
+    DATABASE_URL=sqlite:///bench.db python -m benchmarks.raw_reads
+"""
+
+import os
+import random
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///bench.db")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("ALGORITHM", "HS256")
+
+from fastapi import Response  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app import models, schemas  # noqa: E402
+from app.database import SessionLocal, engine  # noqa: E402
+from app.routers import post  # noqa: E402
+
+N_USERS = 100
+N_POSTS = 20_000
+N_VOTES = 100_000
+CALLS = 300
+
+adapter = TypeAdapter(list[schemas.PostOut])
+
+
+def setup() -> tuple[int, list[int]]:
+    models.Base.metadata.create_all(bind=engine)
+    rng = random.Random(0)
+    tag = time.time_ns()
+    with SessionLocal() as db:
+        users = [
+            models.User(
+                username=f"r{tag}-{i}", email=f"r{tag}-{i}@ex.com", password="x"
+            )
+            for i in range(N_USERS)
+        ]
+        db.add_all(users)
+        db.flush()
+        user_ids = [user.id for user in users]
+        now = models.utcnow()
+        posts = list(
+            db.scalars(
+                insert(models.Post).returning(models.Post.id),
+                [
+                    {
+                        "title": f"post {i}",
+                        "content": "c",
+                        "user_id": rng.choice(user_ids),
+                        "created_at": now,
+                        "modified_at": now,
+                    }
+                    for i in range(N_POSTS)
+                ],
+            )
+        )
+        votes = {(rng.choice(posts), rng.choice(user_ids)) for _ in range(N_VOTES)}
+        db.execute(
+            insert(models.Vote),
+            [{"post_id": post_id, "user_id": user_id} for post_id, user_id in votes],
+        )
+        db.commit()
+    return user_ids[0], posts
+
+
+def serialise(result) -> list:
+    if not isinstance(result, list):
+        result = [result]
+    return adapter.dump_python(adapter.validate_python(result), mode="json")
+
+
+def main() -> None:
+    user_id, post_ids = setup()
+    reads = {
+        "read_posts": lambda db: post.read_posts(
+            db, user_id, Response(), limit=10, offset=100, search="post 1"
+        ),
+        "read_user_posts": lambda db: post.read_user_posts(db, user_id, Response()),
+        "read_post_by_id": lambda db: post.read_post_by_id(post_ids[42], db, user_id),
+    }
+
+    for name, read in reads.items():
+        results, cpu = {}, {}
+        for read_engine in ("orm", "raw"):
+            post.settings.READ_ENGINE = read_engine
+            start = time.process_time()
+            for _ in range(CALLS):
+                with SessionLocal() as db:
+                    results[read_engine] = serialise(read(db))
+            cpu[read_engine] = (time.process_time() - start) / CALLS
+
+        assert results["orm"] == results["raw"], f"{name}: responses differ"
+        print(
+            f"{name:>16}: orm {cpu['orm'] * 1e3:7.2f} ms  raw {cpu['raw'] * 1e3:7.2f}"
+            f" ms  ({cpu['orm'] / cpu['raw']:.1f}x, {len(results['raw'])} posts)"
+        )
+
+
+if __name__ == "__main__":
+    main()
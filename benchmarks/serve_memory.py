@@ -0,0 +1,70 @@
+"""Memory per worker of app.serve with and without preloading (Linux only).
+
+Starts the launcher in both modes and reads the proportional (PSS) and
+private (USS) memory of each worker from /proc once they are serving.
+
+    DATABASE_URL=sqlite:///bench.db python -m benchmarks.serve_memory
+"""
+
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///bench.db")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("ALGORITHM", "HS256")
+
+WORKERS = 4
+PORT = 8765
+
+
+def memory_kib(pid: int) -> tuple[int, int]:
+    values: dict[str, int] = {}
+    with open(f"/proc/{pid}/smaps_rollup") as smaps:
+        for line in smaps:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                values[parts[0].rstrip(":")] = int(parts[1])
+    uss = values["Private_Clean"] + values["Private_Dirty"]
+    return values["Pss"], uss
+
+
+def children(pid: int) -> list[int]:
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(child) for child in f.read().split()]
+
+
+def measure(preload: bool) -> tuple[float, float]:
+    command = [sys.executable, "-m", "app.serve", "--port", str(PORT)]
+    command += ["--workers", str(WORKERS), "--warmup-stagger", "0.2"]
+    command += ["--log-level", "warning"]
+    if not preload:
+        command.append("--no-preload")
+
+    master = subprocess.Popen(command)
+    try:
+        time.sleep(2 + WORKERS * 0.2)
+        for _ in range(WORKERS * 10):
+            urllib.request.urlopen(f"http://127.0.0.1:{PORT}/").read()
+        samples = [memory_kib(pid) for pid in children(master.pid)]
+    finally:
+        master.send_signal(signal.SIGTERM)
+        master.wait()
+
+    pss = sum(sample[0] for sample in samples) / len(samples)
+    uss = sum(sample[1] for sample in samples) / len(samples)
+    return pss / 1024, uss / 1024
+
+
+def main() -> None:
+    for preload in (False, True):
+        pss, uss = measure(preload)
+        name = "preload" if preload else "no preload"
+        print(f"{name:>10}: PSS {pss:6.1f} MiB  USS {uss:6.1f} MiB per worker")
+
+
+if __name__ == "__main__":
+    main()
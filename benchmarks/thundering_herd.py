@@ -0,0 +1,104 @@
+"""Identical concurrent post reads with and without single-flight.
+
+200 threads released at once all request the same search page, as happens
+when a post is shared widely. Reports database executions and latency.
+
+    DATABASE_URL=sqlite:///bench.db python -m benchmarks.thundering_herd
+"""
+
+import os
+import statistics
+import threading
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///bench.db")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("ALGORITHM", "HS256")
+
+from fastapi import Response  # noqa: E402
+from sqlalchemy import event, insert  # noqa: E402
+
+from app import models  # noqa: E402
+from app.database import SessionLocal, engine  # noqa: E402
+from app.routers import post  # noqa: E402
+from app.singleflight import SingleFlight  # noqa: E402
+
+N_POSTS = 50_000
+N_THREADS = 200
+
+
+class NoCoalescing:
+    def do(self, key, func):
+        return func()
+
+
+def setup() -> int:
+    models.Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        user = models.User(
+            username=f"h{time.time_ns()}",
+            email=f"h{time.time_ns()}@ex.com",
+            password="x",
+        )
+        db.add(user)
+        db.flush()
+        now = models.utcnow()
+        db.execute(
+            insert(models.Post),
+            [
+                {
+                    "title": f"post {i}",
+                    "content": "c",
+                    "user_id": user.id,
+                    "created_at": now,
+                    "modified_at": now,
+                }
+                for i in range(N_POSTS)
+            ],
+        )
+        db.commit()
+        return user.id
+
+
+def herd(user_id: int) -> tuple[list[float], int]:
+    barrier = threading.Barrier(N_THREADS)
+    latencies: list[float] = []
+    queries = [0]
+
+    def count(*_) -> None:
+        queries[0] += 1
+
+    def request() -> None:
+        barrier.wait()
+        start = time.perf_counter()
+        with SessionLocal() as db:
+            post.read_posts(db, user_id, Response(), limit=10, offset=0, search="7")
+        latencies.append(time.perf_counter() - start)
+
+    event.listen(engine, "before_cursor_execute", count)
+    threads = [threading.Thread(target=request) for _ in range(N_THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    event.remove(engine, "before_cursor_execute", count)
+    return latencies, queries[0]
+
+
+def main() -> None:
+    user_id = setup()
+    for name, reads in (("off", NoCoalescing()), ("on", SingleFlight())):
+        post.post_reads = reads
+        latencies, queries = herd(user_id)
+        p50 = statistics.median(latencies) * 1000
+        p99 = statistics.quantiles(latencies, n=100)[98] * 1000
+        print(
+            f"single-flight {name:>3}: {queries:4d} queries,"
+            f" p50 {p50:7.1f} ms, p99 {p99:7.1f} ms"
+        )
+        if isinstance(reads, SingleFlight):
+            print(f"  {reads.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Per-request cost of the token revocation check.
+
+Measures `RevocationList.is_revoked` for a token that is not revoked, with
+100k revoked tokens and 10k revoked users loaded, against the JWT decode
+that every request already does. Run with:
+
+    python -m benchmarks.token_revocation
+"""
+
+import os
+import timeit
+import uuid
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-of-32-bytes!")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+
+import jwt  # noqa: E402
+
+from app import oauth2  # noqa: E402
+from app.revocation import RevocationList  # noqa: E402
+
+N_REVOKED_TOKENS = 100_000
+N_REVOKED_USERS = 10_000
+N_CALLS = 1_000_000
+
+
+def main() -> None:
+    revocations = RevocationList()
+    revocations._tokens = {uuid.uuid4().hex: 2**31 for _ in range(N_REVOKED_TOKENS)}
+    revocations._users = {user_id: 0 for user_id in range(N_REVOKED_USERS)}
+
+    token = oauth2.create_access_token({"sub": str(N_REVOKED_USERS + 1)})
+    payload = jwt.decode(
+        token, oauth2.settings.SECRET_KEY, algorithms=[oauth2.settings.ALGORITHM]
+    )
+    jti, issued_ms, user_id = payload["jti"], payload["iat_ms"], int(payload["sub"])
+
+    check = timeit.timeit(
+        lambda: revocations.is_revoked(jti, user_id, issued_ms), number=N_CALLS
+    )
+    decode = timeit.timeit(
+        lambda: jwt.decode(
+            token, oauth2.settings.SECRET_KEY, algorithms=[oauth2.settings.ALGORITHM]
+        ),
+        number=N_CALLS // 100,
+    )
+
+    print(f"revocation check: {check / N_CALLS * 1e9:8.0f} ns/request")
+    print(f"jwt.decode:       {decode / (N_CALLS // 100) * 1e9:8.0f} ns/request")
+
+
+if __name__ == "__main__":
+    main()
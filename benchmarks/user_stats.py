@@ -0,0 +1,108 @@
+"""Compare the user stats counters with computing them from posts and votes.
+
+Builds a user with 100k posts and 100k votes, then times:
+- the old client-side approach: load every post with its like count, as
+  `read_user_posts` does, and sum;
+- an SQL aggregate over posts and votes (`count_user_stats`);
+- reading the counters row (`read_user_stats`).
+
+    DATABASE_URL=sqlite:///bench.db python -m benchmarks.user_stats
+"""
+
+import os
+import random
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///bench.db")
+
+from sqlalchemy import func, insert  # noqa: E402
+
+from app import models, stats  # noqa: E402
+from app.database import SessionLocal, engine  # noqa: E402
+
+N_POSTS = 100_000
+N_VOTERS = 5
+VOTES_PER_VOTER = 20_000
+REPEAT = 5
+
+
+def setup() -> int:
+    models.Base.metadata.create_all(bind=engine)
+    tag = time.time_ns()
+    with SessionLocal() as db:
+        users = [
+            models.User(
+                username=f"b{tag}-{i}", email=f"b{tag}-{i}@ex.com", password="x"
+            )
+            for i in range(N_VOTERS + 1)
+        ]
+        db.add_all(users)
+        db.flush()
+        author, voters = users[0].id, [user.id for user in users[1:]]
+
+        db.execute(
+            insert(models.Post),
+            [
+                {"title": f"t{i}", "content": "c", "user_id": author}
+                for i in range(N_POSTS)
+            ],
+        )
+        post_ids = [
+            post_id
+            for (post_id,) in db.query(models.Post.id).filter(
+                models.Post.user_id == author
+            )
+        ]
+        rng = random.Random(0)
+        db.execute(
+            insert(models.Vote),
+            [
+                {"post_id": post_id, "user_id": voter}
+                for voter in voters
+                for post_id in rng.sample(post_ids, VOTES_PER_VOTER)
+            ],
+        )
+        db.commit()
+        stats.reconcile_user_stats(db)
+        return author
+
+
+def load_posts_and_sum(user_id: int) -> tuple[int, int]:
+    with SessionLocal() as db:
+        posts = (
+            db.query(models.Post, func.count(models.Vote.post_id).label("likes"))
+            .join(models.Vote, models.Vote.post_id == models.Post.id, isouter=True)
+            .group_by(models.Post.id)
+            .filter(models.Post.user_id == user_id)
+            .all()
+        )
+        return len(posts), sum(likes for _, likes in posts)
+
+
+def sql_aggregate(user_id: int) -> tuple[int, int]:
+    with SessionLocal() as db:
+        return stats.count_user_stats(db, [user_id])[user_id]
+
+
+def counters(user_id: int) -> tuple[int, int]:
+    with SessionLocal() as db:
+        user_stats = stats.read_user_stats(db, user_id)
+        return user_stats.post_count, user_stats.likes_received
+
+
+def main() -> None:
+    user_id = setup()
+    for name, func_ in (
+        ("load posts + sum", load_posts_and_sum),
+        ("SQL aggregate", sql_aggregate),
+        ("counters row", counters),
+    ):
+        start = time.perf_counter()
+        for _ in range(REPEAT):
+            result = func_(user_id)
+        elapsed = (time.perf_counter() - start) / REPEAT
+        print(f"{name:>17}: {elapsed * 1000:10.2f} ms  {result}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Lookup latency and memory of the username prefix index at 1M users.
+
+DATABASE_URL=sqlite:///bench.db python -m benchmarks.username_search
+"""
+
+import os
+import random
+import string
+import time
+import tracemalloc
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///bench.db")
+
+from sqlalchemy import insert, select  # noqa: E402
+
+from app import models  # noqa: E402
+from app.database import SessionLocal, engine  # noqa: E402
+from app.username_index import UsernameIndex  # noqa: E402
+
+N_USERS = 1_000_000
+N_LOOKUPS = 100_000
+BATCH = 50_000
+
+
+def random_username(rng: random.Random) -> str:
+    length = rng.randint(5, 14)
+    name = "".join(rng.choices(string.ascii_lowercase + string.digits, k=length))
+    return name.capitalize() if rng.random() < 0.2 else name
+
+
+def setup(rng: random.Random) -> None:
+    models.Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        existing = db.scalar(select(models.User.id).limit(1))
+        if existing is not None:
+            return
+        names = {random_username(rng) for _ in range(N_USERS * 11 // 10)}
+        names = list(names)[:N_USERS]
+        for start in range(0, len(names), BATCH):
+            db.execute(
+                insert(models.User),
+                [
+                    {"username": name, "email": f"{name}@ex.com", "password": "x"}
+                    for name in names[start : start + BATCH]
+                ],
+            )
+        db.commit()
+
+
+def main() -> None:
+    rng = random.Random(0)
+    setup(rng)
+
+    index = UsernameIndex(max_size=2 * N_USERS)
+    tracemalloc.start()
+    start = time.perf_counter()
+    with SessionLocal() as db:
+        index.sync(db)
+    build = time.perf_counter() - start
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    prefixes = [random_username(rng)[: rng.randint(1, 4)] for _ in range(N_LOOKUPS)]
+    start = time.perf_counter()
+    for prefix in prefixes:
+        index.search(prefix, 10)
+    lookup = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(1000):
+        index.add(f"newuser{i}")
+    insert_time = time.perf_counter() - start
+
+    print(f"usernames indexed: {len(index.keys):,}")
+    print(f"build from db:     {build:.2f} s")
+    per_user = memory / len(index.keys)
+    print(f"index memory:      {memory / 2**20:.1f} MiB ({per_user:.0f} B/user)")
+    print(f"lookup (top 10):   {lookup / N_LOOKUPS * 1e6:.2f} us")
+    print(f"incremental add:   {insert_time / 1000 * 1e6:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+import os
+
+# Settings are read when the app is imported, so point it at a throwaway
+# in-memory database first.
+os.environ["DATABASE_URL"] = "sqlite://"
+os.environ.setdefault("SECRET_KEY", "test")
+os.environ.setdefault("ALGORITHM", "HS256")
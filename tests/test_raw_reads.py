@@ -0,0 +1,140 @@
+"""READ_ENGINE=raw must answer the hot post reads exactly like the ORM."""
+
+from typing import Any, Callable
+
+import pytest
+from fastapi import HTTPException, Response
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.author_cache import authors
+from app.database import SessionLocal, engine
+from app.routers import post
+
+adapter = TypeAdapter(list[schemas.PostOut])
+
+
+@pytest.fixture(scope="module")
+def ids() -> dict[str, int]:
+    """Two users' published, unpublished and soft-deleted posts, with votes."""
+    models.Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        users = {
+            name: models.User(username=name, email=f"{name}@ex.com", password="x")
+            for name in ("alice", "bob", "carol")
+        }
+        db.add_all(users.values())
+        db.flush()
+
+        now = models.utcnow()
+        posts = {
+            f"{name} {kind}": models.Post(
+                title=f"{name} {kind}",
+                content="c",
+                published=kind != "draft",
+                user_id=users[name].id,
+                created_at=now,
+                modified_at=now,
+                deleted_at=now if kind == "deleted" else None,
+            )
+            for name in ("alice", "bob")
+            for kind in ("public", "draft", "deleted")
+        }
+        db.add_all(posts.values())
+        db.flush()
+
+        voters = list(users.values())
+        for votes, key in enumerate(posts):
+            db.add_all(
+                models.Vote(post_id=posts[key].id, user_id=voter.id)
+                for voter in voters[: votes % 4]
+            )
+        db.commit()
+
+        return {
+            **{name: user.id for name, user in users.items()},
+            **{key: row.id for key, row in posts.items()},
+        }
+
+
+def read(
+    monkeypatch: pytest.MonkeyPatch,
+    read_engine: str,
+    call: Callable[[Session], Any],
+) -> Any:
+    """The serialised response of a read, or the status and detail it raised."""
+    monkeypatch.setattr(post.settings, "READ_ENGINE", read_engine)
+    # Both engines fill in the authors from the cache; start each one cold.
+    authors.clear()
+    with SessionLocal() as db:
+        try:
+            result = call(db)
+        except HTTPException as error:
+            return error.status_code, error.detail
+
+    if not isinstance(result, list):
+        result = [result]
+    return adapter.dump_python(adapter.validate_python(result), mode="json")
+
+
+def assert_same(monkeypatch: pytest.MonkeyPatch, call: Callable[[Session], Any]) -> Any:
+    orm = read(monkeypatch, "orm", call)
+    assert read(monkeypatch, "raw", call) == orm
+    return orm
+
+
+@pytest.mark.parametrize("search", ["", "alice", "draft", "deleted", "nothing"])
+@pytest.mark.parametrize("limit, offset", [(10, 0), (2, 1), (10, 4)])
+def test_read_posts(ids, monkeypatch, search, limit, offset):
+    def call(db: Session) -> Any:
+        return post.read_posts(
+            db, ids["alice"], Response(), limit=limit, offset=offset, search=search
+        )
+
+    result = assert_same(monkeypatch, call)
+    if isinstance(result, list):
+        assert all("deleted" not in row["title"] for row in result)
+
+
+@pytest.mark.parametrize("user", ["alice", "bob", "carol"])
+def test_read_user_posts(ids, monkeypatch, user):
+    def call(db: Session) -> Any:
+        return post.read_user_posts(db, ids[user], Response())
+
+    result = assert_same(monkeypatch, call)
+    if user == "carol":
+        assert result == (404, "No posts found")
+    else:
+        assert sorted(row["title"] for row in result) == [
+            f"{user} draft",
+            f"{user} public",
+        ]
+
+
+@pytest.mark.parametrize(
+    "key",
+    [
+        "alice public",
+        "alice draft",
+        "alice deleted",
+        "bob public",
+        "bob draft",
+        "bob deleted",
+        "missing",
+    ],
+)
+@pytest.mark.parametrize("user", ["alice", "bob"])
+def test_read_post_by_id(ids, monkeypatch, key, user):
+    post_id = ids.get(key, max(ids.values()) + 1)
+
+    def call(db: Session) -> Any:
+        return post.read_post_by_id(post_id, db, ids[user])
+
+    result = assert_same(monkeypatch, call)
+    if key == "missing" or key.endswith("deleted"):
+        assert result[0] == 404
+    elif key.endswith("draft") and not key.startswith(user):
+        assert result[0] == 403
+    else:
+        assert result[0]["id"] == post_id